@@ -0,0 +1,397 @@
+import time as timer
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import odeint, ODEintWarning
+from scipy.optimize import least_squares
+
+# ---------------------------------------------------------------
+# 1) KINETIC MODELS AND THEIR JACOBIANS
+#    Each model is given as (rhs, d(rhs)/dy, d(rhs)/dp) so that the
+#    forward sensitivities dy/dp and dy/dy0 can be integrated
+#    together with the concentrations.
+# ---------------------------------------------------------------
+
+# Consecutive reaction A -> B -> C (Chapter2/listing06.py)
+def consecutive(y, t, k1, k2):
+    A, B, C = y
+    return np.array([-k1 * A, k1 * A - k2 * B, k2 * B])
+
+def consecutive_jac_y(y, k1, k2):
+    return np.array([[-k1, 0.0, 0.0],
+                     [ k1, -k2, 0.0],
+                     [0.0,  k2, 0.0]])
+
+def consecutive_jac_p(y, k1, k2):
+    A, B, C = y
+    return np.array([[ -A, 0.0],
+                     [  A,  -B],
+                     [0.0,   B]])
+
+# Self-catalyzed reaction A + B -> 2B (Chapter2/listing10.py), written in
+# terms of C_A and C_B so that CA0 and CB0 become initial conditions.
+def self_catalyzed(y, t, k):
+    CA, CB = y
+    rate = k * CA * CB
+    return np.array([-rate, rate])
+
+def self_catalyzed_jac_y(y, k):
+    CA, CB = y
+    return np.array([[-k * CB, -k * CA],
+                     [ k * CB,  k * CA]])
+
+def self_catalyzed_jac_p(y, k):
+    CA, CB = y
+    return np.array([[-CA * CB],
+                     [ CA * CB]])
+
+# Chain of first-order steps A1 -> A2 -> ... -> A(m+1) with one rate
+# constant per step, the A -> B -> C model extended to m steps
+def chain(y, t, *k):
+    flux = np.multiply(k, y[:-1])
+    dy = np.zeros_like(y)
+    dy[:-1] -= flux
+    dy[1:] += flux
+    return dy
+
+def chain_jac_y(y, *k):
+    i = np.arange(len(k))
+    J = np.zeros((len(y), len(y)))
+    J[i, i], J[i + 1, i] = np.negative(k), k
+    return J
+
+def chain_jac_p(y, *k):
+    i = np.arange(len(k))
+    J = np.zeros((len(y), len(k)))
+    J[i, i], J[i + 1, i] = -y[:-1], y[:-1]
+    return J
+
+# Lotka's autocatalytic oscillator A + X -> 2X, X + Y -> 2Y, Y -> P with
+# the reservoir A held constant (k1 includes [A]); y = [C_X, C_Y]
+def lotka(y, t, k1, k2, k3):
+    X, Y = y
+    return np.array([k1 * X - k2 * X * Y, k2 * X * Y - k3 * Y])
+
+def lotka_jac_y(y, k1, k2, k3):
+    X, Y = y
+    return np.array([[k1 - k2 * Y, -k2 * X],
+                     [     k2 * Y, k2 * X - k3]])
+
+def lotka_jac_p(y, k1, k2, k3):
+    X, Y = y
+    return np.array([[  X, -X * Y, 0.0],
+                     [0.0,  X * Y,  -Y]])
+
+# Models are looked up by name so that worker processes only receive
+# plain data (strings and arrays) instead of functions.
+MODELS = {
+    'consecutive': (consecutive, consecutive_jac_y, consecutive_jac_p),
+    'self_catalyzed': (self_catalyzed, self_catalyzed_jac_y, self_catalyzed_jac_p),
+    'chain': (chain, chain_jac_y, chain_jac_p),
+    'lotka': (lotka, lotka_jac_y, lotka_jac_p),
+}
+
+# ---------------------------------------------------------------
+# 2) FORWARD SENSITIVITIES
+#    For dy/dt = f(y, p) the sensitivity matrix S = dy/d(y0, p)
+#    obeys dS/dt = J_y S + [0 | J_p] with S(0) = [I | 0].
+# ---------------------------------------------------------------
+
+def integrate_with_sensitivities(name, y0, t, p, wrt_y0=True, rtol=1.49012e-8, atol=1.49012e-8):
+    """
+    Parameters:
+        name       : str   -> Key of the model in MODELS.
+        y0         : array -> State at t[0].
+        t          : array -> Output times (t[0] is the start time).
+        p          : array -> Rate constants.
+        wrt_y0     : bool  -> Also integrate the sensitivities to y0.
+        rtol, atol : float -> odeint tolerances (default: those of odeint).
+
+    Returns:
+        y (len(t), n) and S (len(t), n, n + m), the sensitivities of y
+        with respect to the initial state and the rate constants. With
+        wrt_y0=False, S (len(t), n, m) holds only the latter.
+    """
+    rhs, jac_y, jac_p = MODELS[name]
+    n, m = len(y0), len(p)
+    # A segment that starts from a known initial condition needs no
+    # sensitivities to it, which saves n^2 of the n (n + m) equations
+    k = n if wrt_y0 else 0
+    S0 = np.hstack([np.eye(n, k), np.zeros((n, m))])
+    z0 = np.concatenate([y0, S0.ravel()])
+
+    def augmented_rhs(z, t):
+        y = z[:n]
+        S = z[n:].reshape(n, k + m)
+        dS = jac_y(y, *p) @ S
+        dS[:, k:] += jac_p(y, *p)
+        return np.concatenate([rhs(y, t, *p), dS.ravel()])
+
+    Z = odeint(augmented_rhs, z0, t, rtol=rtol, atol=atol, mxstep=20000)
+    return Z[:, :n], Z[:, n:].reshape(len(t), n, k + m)
+
+# ---------------------------------------------------------------
+# 3) RESIDUALS OF ONE EXPERIMENT (MULTIPLE SHOOTING)
+#    The time grid is cut into segments. The first segment starts
+#    from the known initial condition, every later segment from a
+#    free state s_j. Continuity y_j(end) = s_{j+1} is added as an
+#    extra (weighted) residual. With a single segment this reduces
+#    to ordinary single shooting.
+# ---------------------------------------------------------------
+
+def segment_bounds(n_points, n_segments):
+    return np.linspace(0, n_points - 1, n_segments + 1).round().astype(int)
+
+def experiment_residuals(args):
+    """
+    Parameters:
+        args : tuple -> (experiment, log_p, shooting_states, n_segments,
+                         continuity_weight, rtol, atol)
+
+    Returns:
+        Residual vector r and its Jacobians with respect to log(p) and
+        with respect to the experiment's own shooting states.
+    """
+    experiment, log_p, states, n_segments, weight, rtol, atol = args
+    name, y0, t, data = (experiment[key] for key in ('model', 'y0', 't', 'data'))
+    p = np.exp(log_p)
+    n, m = len(y0), len(p)
+    bounds = segment_bounds(len(t), n_segments)
+    n_free = n * (n_segments - 1)
+
+    residuals, jac_theta, jac_states = [], [], []
+    for j in range(n_segments):
+        lo, hi = bounds[j], bounds[j + 1]
+        start = y0 if j == 0 else states[(j - 1) * n:j * n]
+        # A trial step far from the data can make a segment blow up; the
+        # non-finite residuals make least_squares shrink its trust region
+        with np.errstate(over='ignore', invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', ODEintWarning)
+            y, S = integrate_with_sensitivities(name, start, t[lo:hi + 1], p, j > 0, rtol, atol)
+        k = n if j > 0 else 0
+
+        # Data residuals at t[lo+1], ..., t[hi]
+        r = (y[1:] - data[lo + 1:hi + 1]).ravel()
+        d_theta = (S[1:, :, k:] * p).reshape(-1, m)  # chain rule dp/dlog(p) = p
+        d_states = np.zeros((r.size, n_free))
+        if j > 0:
+            d_states[:, (j - 1) * n:j * n] = S[1:, :, :n].reshape(-1, n)
+        residuals.append(r)
+        jac_theta.append(d_theta)
+        jac_states.append(d_states)
+
+        # Continuity residual y_j(t[hi]) - s_{j+1}
+        if j < n_segments - 1:
+            r = weight * (y[-1] - states[j * n:(j + 1) * n])
+            d_theta = weight * S[-1, :, k:] * p
+            d_states = np.zeros((n, n_free))
+            d_states[:, j * n:(j + 1) * n] = -weight * np.eye(n)
+            if j > 0:
+                d_states[:, (j - 1) * n:j * n] = weight * S[-1, :, :n]
+            residuals.append(r)
+            jac_theta.append(d_theta)
+            jac_states.append(d_states)
+
+    return np.concatenate(residuals), np.vstack(jac_theta), np.vstack(jac_states)
+
+# ---------------------------------------------------------------
+# 4) THE ESTIMATOR
+# ---------------------------------------------------------------
+
+class ParameterEstimator:
+    """
+    Fits rate constants to several experiments at once.
+
+    Parameters:
+        experiments       : list  -> Dicts with keys 'model', 'y0', 't', 'data'.
+        n_segments        : int   -> Shooting segments per experiment (1 = single shooting).
+        continuity_weight : float -> Weight of the continuity residuals.
+        max_workers       : int   -> Worker processes (None = one per CPU, 0 = serial).
+        rtol, atol        : float -> Integration tolerances (default: those of odeint).
+    """
+
+    def __init__(self, experiments, n_segments=1, continuity_weight=10.0, max_workers=None,
+                 rtol=1.49012e-8, atol=1.49012e-8):
+        self.experiments = experiments
+        self.rtol, self.atol = rtol, atol
+        self.n_segments = n_segments
+        self.weight = continuity_weight
+        self.max_workers = max_workers
+        self._last_x = None
+        self._last_value = None
+
+    def _initial_states(self, experiment):
+        # Shooting states start at the measured data, which is what
+        # makes multiple shooting robust against poor rate constants.
+        bounds = segment_bounds(len(experiment['t']), self.n_segments)
+        return np.concatenate([experiment['data'][b] for b in bounds[1:-1]] or [np.empty(0)])
+
+    def _evaluate(self, x, m, pool):
+        # least_squares asks for residuals and Jacobian separately, so
+        # both are computed in one pass and cached for the same x.
+        if self._last_x is not None and np.array_equal(x, self._last_x):
+            return self._last_value
+        log_p, offset, jobs = x[:m], m, []
+        for experiment in self.experiments:
+            size = len(experiment['y0']) * (self.n_segments - 1)
+            jobs.append((experiment, log_p, x[offset:offset + size], self.n_segments, self.weight,
+                         self.rtol, self.atol))
+            offset += size
+        results = list(pool.map(experiment_residuals, jobs)) if pool else list(map(experiment_residuals, jobs))
+
+        r = np.concatenate([res[0] for res in results])
+        J = np.zeros((r.size, x.size))
+        row, col = 0, m
+        for res_r, res_theta, res_states in results:
+            J[row:row + res_r.size, :m] = res_theta
+            J[row:row + res_r.size, col:col + res_states.shape[1]] = res_states
+            row += res_r.size
+            col += res_states.shape[1]
+        self._last_x, self._last_value = x.copy(), (r, J)
+        return r, J
+
+    def fit(self, p_guess):
+        """
+        Returns:
+            Dict with the fitted rate constants 'p', their covariance
+            'cov', standard errors 'std', the residual variance 'sigma2'
+            and the underlying least_squares result.
+        """
+        m = len(p_guess)
+        x0 = np.concatenate([np.log(p_guess)] + [self._initial_states(e) for e in self.experiments])
+        self._last_x = None
+
+        pool = ProcessPoolExecutor(self.max_workers) if self.max_workers != 0 else None
+        try:
+            result = least_squares(lambda x: self._evaluate(x, m, pool)[0], x0,
+                                   jac=lambda x: self._evaluate(x, m, pool)[1],
+                                   method='trf', x_scale='jac')
+            # The continuity residuals are only penalized, so polish the
+            # shooting result with single shooting from the same rate constants.
+            if self.n_segments > 1:
+                polish = ParameterEstimator(self.experiments, 1, self.weight, self.max_workers, self.rtol, self.atol)
+                result = least_squares(lambda x: polish._evaluate(x, m, pool)[0], result.x[:m],
+                                       jac=lambda x: polish._evaluate(x, m, pool)[1],
+                                       method='trf', x_scale='jac')
+        finally:
+            if pool:
+                pool.shutdown()
+
+        # Covariance from the single-shooting Jacobian at the optimum:
+        #     cov(p) = sigma^2 (J^T J)^-1,  sigma^2 = SSR / (N - m)
+        p = np.exp(result.x[:m])
+        blocks = [experiment_residuals((e, np.log(p), np.empty(0), 1, 0.0, self.rtol, self.atol))
+                  for e in self.experiments]
+        r = np.concatenate([b[0] for b in blocks])
+        J = np.vstack([b[1] for b in blocks]) / p  # back from log(p) to p
+        sigma2 = r @ r / (r.size - m)
+        cov = sigma2 * np.linalg.inv(J.T @ J)
+        return {'p': p, 'cov': cov, 'std': np.sqrt(np.diag(cov)), 'sigma2': sigma2, 'result': result}
+
+# ---------------------------------------------------------------
+# 5) DEMONSTRATION WITH SYNTHETIC DATA
+# ---------------------------------------------------------------
+
+def make_experiments(name, initial_conditions, p_true, t, noise, rng):
+    experiments = []
+    for y0 in initial_conditions:
+        y0 = np.asarray(y0, dtype=float)
+        y = odeint(MODELS[name][0], y0, t, args=tuple(p_true), rtol=1e-10, atol=1e-12)
+        data = y + noise * rng.standard_normal(y.shape)
+        data[0] = y0
+        experiments.append({'model': name, 'y0': y0, 't': t, 'data': data})
+    return experiments
+
+def finite_difference_fit(experiments, p_guess):
+    # The previous approach: odeint wrapped in a finite-difference optimizer
+    def residuals(log_p):
+        p = tuple(np.exp(log_p))
+        return np.concatenate([
+            (odeint(MODELS[e['model']][0], e['y0'], e['t'], args=p) - e['data'])[1:].ravel()
+            for e in experiments])
+    return np.exp(least_squares(residuals, np.log(p_guess)).x)
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+
+    # A -> B -> C with k1 = 1/2, k2 = 1/3 and four different initial mixtures
+    time = np.linspace(0, 10, 100)
+    k_true = np.array([1.0/2.0, 1.0/3.0])
+    experiments = make_experiments('consecutive',
+                                   [[1.0, 0.0, 0.0], [0.5, 0.5, 0.0], [1.0, 0.3, 0.2], [0.2, 1.0, 0.0]],
+                                   k_true, time, noise=0.01, rng=rng)
+
+    # Both fits integrate with the default odeint tolerances
+    start = timer.perf_counter()
+    p_fd = finite_difference_fit(experiments, [1.0, 1.0])
+    t_fd = timer.perf_counter() - start
+
+    start = timer.perf_counter()
+    fit = ParameterEstimator(experiments, max_workers=0).fit([1.0, 1.0])
+    t_sens = timer.perf_counter() - start
+
+    # Worker processes only pay off once a single experiment is expensive
+    # (many species, stiff chemistry); for this small model they add overhead.
+    start = timer.perf_counter()
+    ParameterEstimator(experiments, max_workers=4).fit([1.0, 1.0])
+    t_pool = timer.perf_counter() - start
+
+    print("Consecutive reaction A -> B -> C")
+    print(f"  true k          : {k_true}")
+    print(f"  finite-diff fit : {p_fd}  ({t_fd:.2f} s)")
+    print(f"  sensitivity fit : {fit['p']}  ({t_sens:.2f} s serial, {t_pool:.2f} s with 4 workers)")
+    print(f"  standard errors : {fit['std']}")
+    print(f"  correlation     : {fit['cov'][0, 1] / np.prod(fit['std']):.3f}")
+
+    # With two rate constants the sensitivity fit is slower: each call of
+    # the augmented right-hand side costs several plain calls, and its error
+    # control takes more steps. The finite differences need m + 1
+    # integrations per Jacobian, the sensitivities still one, so the gain
+    # shows with more rate constants: a chain of 12 first-order steps
+    k_chain = np.linspace(1.5, 0.3, 12)
+    chain_experiments = make_experiments('chain', [np.eye(13)[0], np.eye(13)[:2].mean(axis=0)],
+                                         k_chain, np.linspace(0, 20, 100), noise=0.01, rng=rng)
+    start = timer.perf_counter()
+    p_fd = finite_difference_fit(chain_experiments, np.ones(12))
+    t_fd = timer.perf_counter() - start
+    start = timer.perf_counter()
+    chain_fit = ParameterEstimator(chain_experiments, max_workers=0).fit(np.ones(12))
+    t_sens = timer.perf_counter() - start
+    print("\nChain of 12 first-order steps, max |k_fit / k_true - 1|:")
+    print(f"  finite-diff fit : {np.abs(p_fd / k_chain - 1).max():.3f}  ({t_fd:.2f} s)")
+    print(f"  sensitivity fit : {np.abs(chain_fit['p'] / k_chain - 1).max():.3f}  ({t_sens:.2f} s)")
+
+    # Poor initial guess for an oscillating system: single shooting locks
+    # onto a wrong period, while multiple shooting starts every segment
+    # from the data and recovers the true rate constants
+    k_lotka = np.array([1.0, 0.5, 1.2])
+    lotka_experiments = make_experiments('lotka', [[1.0, 0.5], [2.0, 1.0]], k_lotka,
+                                         np.linspace(0, 30, 150), noise=0.02, rng=rng)
+    poor_guess = [2.0, 0.2, 2.5]
+    single = ParameterEstimator(lotka_experiments, n_segments=1, max_workers=0).fit(poor_guess)
+    multi = ParameterEstimator(lotka_experiments, n_segments=6, max_workers=0).fit(poor_guess)
+    print(f"\nLotka oscillator, true k = {k_lotka}, from the poor guess {poor_guess}:")
+    print(f"  single shooting : {single['p']}  (cost {single['result'].cost:.3e})")
+    print(f"  multi shooting  : {multi['p']}  (cost {multi['result'].cost:.3e})")
+
+    # Self-catalyzed reaction with several acetone / hydronium loadings
+    time_sc = np.linspace(0, 100, 200)
+    sc_experiments = make_experiments('self_catalyzed',
+                                      [[0.8, 0.001], [0.6, 0.005], [1.0, 0.002]],
+                                      [0.2], time_sc, noise=0.005, rng=rng)
+    sc_fit = ParameterEstimator(sc_experiments, max_workers=3).fit([1.0])
+    print(f"\nSelf-catalyzed reaction: k = {sc_fit['p'][0]:.4f} +/- {sc_fit['std'][0]:.4f} (true 0.2)")
+
+    # Plot the data and the fitted curves of the consecutive reaction
+    plt.figure(figsize=(8, 6))
+    for e, style in zip(experiments, ['solid', 'dotted', 'dashed', 'dashdot']):
+        y_fit = odeint(consecutive, e['y0'], e['t'], args=tuple(fit['p']))
+        for i, color in enumerate(['blue', 'green', 'red']):
+            plt.plot(e['t'], e['data'][:, i], '.', color=color, markersize=3)
+            plt.plot(e['t'], y_fit[:, i], color=color, linestyle=style)
+    plt.xlabel('Time')
+    plt.ylabel('Concentration')
+    plt.title('Global Fit of A -> B -> C to Four Experiments')
+    plt.grid(True)
+    plt.show()
@@ -0,0 +1,473 @@
+"""
+Local simulation job server for the Chapter 2 mechanisms.
+
+Start the server (from the repository root) with
+
+    python -m Chapter2.listing12 --port 8765
+
+or run a self-contained throughput demonstration with
+
+    python -m Chapter2.listing12 --demo
+
+Jobs are posted as newline-delimited JSON to POST /jobs, one job per line:
+
+    {"id": 1, "mechanism": "consecutive", "params": [0.5, 0.333],
+     "y0": [1.0, 0.0, 0.0], "t": [0, 1, 2, 5, 10]}
+
+and the results are streamed back (chunked, one JSON line per job) as soon
+as the batch containing each job has been integrated. GET /stats returns
+the server counters.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time as timer
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.integrate import RK45, LSODA
+
+# ---------------------------------------------------------------
+# 1) MECHANISMS
+#    Right-hand sides are vectorized over a batch: y has shape
+#    (n_species, batch) and p has shape (n_params, batch), so a whole
+#    batch of jobs is integrated as one ODE system.
+# ---------------------------------------------------------------
+
+def consecutive(t, y, p):
+    # A -> B -> C (Chapter2/listing06.py)
+    A, B, C = y
+    k1, k2 = p
+    return np.array([-k1 * A, k1 * A - k2 * B, k2 * B])
+
+def reversible(t, y, p):
+    # A <=> B (Chapter2/listing03.py), y = [C_A, C_B]
+    A, B = y
+    k1, k2 = p
+    r = k1 * A - k2 * B
+    return np.array([-r, r])
+
+def successive(t, y, p):
+    # A -> B, B + C -> P (Chapter2/listing07.py)
+    A, B, C, P = y
+    k1, k2 = p
+    r2 = k2 * B * C
+    return np.array([-k1 * A, k1 * A - r2, -r2, r2])
+
+def parallel(t, y, p):
+    # A -> B, A -> C (Chapter2/listing08.py)
+    A, B, C = y
+    k1, k2 = p
+    return np.array([-(k1 + k2) * A, k1 * A, k2 * A])
+
+def self_catalyzed(t, y, p):
+    # A + B -> 2B (Chapter2/listing10.py), y = [C_A, C_B]
+    A, B = y
+    (k,) = p
+    r = k * A * B
+    return np.array([-r, r])
+
+# name -> (rhs, number of species, number of rate constants)
+MECHANISMS = {
+    'consecutive': (consecutive, 3, 2),
+    'reversible': (reversible, 2, 2),
+    'successive': (successive, 4, 2),
+    'parallel': (parallel, 3, 2),
+    'self_catalyzed': (self_catalyzed, 2, 1),
+}
+
+# ---------------------------------------------------------------
+# 2) WORKER SIDE
+#    Worker processes import everything once and integrate a full
+#    batch per call, so the per-job cost is a few array operations.
+#    Every integration is stepped by hand with a cap on the number of
+#    steps and on the wall-clock time, so a job with extreme rate
+#    constants cannot hold a worker. When the batch as a whole fails,
+#    its jobs are retried one by one with the stiff solver LSODA and
+#    only the jobs that fail on their own report an error.
+#    The step size of a batch is controlled by its least accurate job:
+#    the error norm is the largest of the per-job RMS norms, so every
+#    job meets rtol / atol as if it had been integrated alone.
+# ---------------------------------------------------------------
+
+class BatchRK45(RK45):
+    """
+    RK45 for `batch` independent jobs stored as y.reshape(n, batch).
+
+    A single RMS norm over the whole state would divide each job's
+    error by about sqrt(n * batch), so one job's accuracy would depend
+    on the others in its batch.
+    """
+
+    def __init__(self, fun, t0, y0, t_bound, batch, **options):
+        self.batch = batch
+        super().__init__(fun, t0, y0, t_bound, **options)
+
+    def _estimate_error_norm(self, K, h, scale):
+        error = (self._estimate_error(K, h) / scale).reshape(-1, self.batch)
+        return np.sqrt(np.mean(error**2, axis=0)).max()
+
+def warm_up():
+    # Pre-load the heavy modules and touch every mechanism once
+    import sympy  # noqa: F401  (the listings import SymPy, keep it warm)
+    for name, (rhs, n, m) in MECHANISMS.items():
+        simulate_batch(name, [0.0, 1.0], np.ones((1, n)), np.ones((1, m)))
+
+def integrate(fun, t, y0, solver_class, rtol, atol, max_steps, time_limit, **options):
+    """
+    Returns:
+        The solution at the times t, shape (n, len(t)). Raises
+        RuntimeError when the solver fails, the state stops being
+        finite, or max_steps / time_limit (seconds) are exceeded.
+    """
+    deadline = timer.perf_counter() + time_limit
+    solver = solver_class(fun, t[0], y0, t[-1], rtol=rtol, atol=atol, **options)
+    out = np.empty((len(y0), len(t)))
+    out[:, 0] = y0
+    i, steps = 1, 0
+    while i < len(t):
+        message = solver.step()
+        steps += 1
+        if solver.status == 'failed':
+            raise RuntimeError(message)
+        if not np.all(np.isfinite(solver.y)):
+            raise RuntimeError("the solution is no longer finite")
+        j = np.searchsorted(t, solver.t, side='right')
+        if j > i:
+            out[:, i:j] = solver.dense_output()(t[i:j])
+            i = j
+        if i < len(t) and steps >= max_steps:
+            raise RuntimeError(f"more than {max_steps} steps needed")
+        if i < len(t) and timer.perf_counter() > deadline:
+            raise RuntimeError(f"time limit of {time_limit} s exceeded")
+    return out
+
+def simulate_batch(name, t, y0s, params, rtol=1e-6, atol=1e-9, max_steps=20000, time_limit=5.0):
+    """
+    Parameters:
+        name   : str   -> Key of the mechanism in MECHANISMS.
+        t      : list  -> Common output time grid of the batch.
+        y0s    : array -> Initial states, shape (batch, n_species).
+        params : array -> Rate constants, shape (batch, n_params).
+
+    Returns:
+        One entry per job: concentrations with shape (len(t), n_species),
+        or an error message.
+    """
+    rhs, n, m = MECHANISMS[name]
+    t = np.asarray(t, dtype=float)
+    y0s, params = np.asarray(y0s, dtype=float), np.asarray(params, dtype=float)
+    batch = len(y0s)
+    p = params.T
+
+    def fun(t, y):
+        return rhs(t, y.reshape(n, batch), p).ravel()
+
+    try:
+        y = integrate(fun, t, y0s.T.ravel(), BatchRK45, rtol, atol, max_steps, time_limit, batch=batch)
+        return list(y.reshape(n, batch, len(t)).transpose(1, 2, 0))
+    except RuntimeError:
+        pass
+
+    results = []
+    for y0, p_job in zip(y0s, params):
+        try:
+            y = integrate(lambda t, y: rhs(t, y, p_job), t, y0, LSODA, rtol, atol, max_steps, time_limit)
+            results.append(y.T)
+        except RuntimeError as error:
+            results.append(str(error))
+    return results
+
+# ---------------------------------------------------------------
+# 3) SERVER SIDE
+# ---------------------------------------------------------------
+
+class JobServer:
+    """
+    Accepts jobs, batches compatible ones (same mechanism and time grid)
+    and runs the batches on a pool of warm worker processes.
+
+    Parameters:
+        workers     : int   -> Number of worker processes.
+        max_batch   : int   -> Largest number of jobs integrated together.
+        max_wait    : float -> Seconds to wait for a batch to fill up.
+        max_pending : int   -> Queued jobs before new requests are refused (HTTP 503).
+    """
+
+    def __init__(self, workers=None, max_batch=512, max_wait=0.005, max_pending=50000):
+        self.workers = workers or os.cpu_count()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        # At most two batches per worker are in flight; the batcher stops
+        # pulling from the queue when they are taken, so the queue fills
+        # up and new requests are refused instead of piling up in memory.
+        self.slots = asyncio.Semaphore(2 * self.workers)
+        self.stats = {'accepted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'batches': 0}
+        self.pool = None
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(self.workers, initializer=warm_up)
+        loop = asyncio.get_running_loop()
+        # Force every worker to start (and warm up) before serving
+        await asyncio.gather(*[loop.run_in_executor(self.pool, os.getpid) for _ in range(self.workers)])
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        self._batcher.cancel()
+        self.pool.shutdown()
+
+    # -- batching ------------------------------------------------
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            groups = {}
+            for job, future in batch:
+                groups.setdefault((job['mechanism'], tuple(job['t'])), []).append((job, future))
+            for (name, t), group in groups.items():
+                await self.slots.acquire()
+                asyncio.create_task(self._run_batch(name, list(t), group))
+
+    async def _run_batch(self, name, t, group):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.pool, simulate_batch, name, t,
+                                                 [job['y0'] for job, _ in group],
+                                                 [job['params'] for job, _ in group])
+            for (job, future), result in zip(group, results):
+                if isinstance(result, str):
+                    future.set_result({'id': job.get('id'), 'error': result})
+                    self.stats['failed'] += 1
+                else:
+                    future.set_result({'id': job.get('id'), 'y': result.tolist()})
+                    self.stats['completed'] += 1
+        except Exception as error:
+            for job, future in group:
+                future.set_result({'id': job.get('id'), 'error': str(error)})
+            self.stats['failed'] += len(group)
+        finally:
+            self.stats['batches'] += 1
+            self.slots.release()
+
+    # -- job intake ----------------------------------------------
+
+    @staticmethod
+    def _numbers(value):
+        # A list of finite JSON numbers as an array, None for anything else
+        if not isinstance(value, list) or not all(
+                isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+            return None
+        values = np.array(value, dtype=float)
+        return values if np.all(np.isfinite(values)) else None
+
+    def validate(self, job):
+        if not isinstance(job, dict):
+            return "a job must be a JSON object"
+        name = job.get('mechanism')
+        if not isinstance(name, str) or name not in MECHANISMS:
+            return f"unknown mechanism {name!r}"
+        _, n, m = MECHANISMS[name]
+        y0, params, t = (self._numbers(job.get(key)) for key in ('y0', 'params', 't'))
+        if y0 is None or len(y0) != n or np.any(y0 < 0):
+            return f"y0 must be a list of {n} finite, non-negative numbers"
+        if params is None or len(params) != m or np.any(params < 0):
+            return f"params must be a list of {m} finite, non-negative numbers"
+        if t is None or len(t) < 2 or np.any(np.diff(t) <= 0):
+            return "t must be an increasing list of at least two finite numbers"
+        return None
+
+    def submit(self, job):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((job, future))
+        self.stats['accepted'] += 1
+        return future
+
+    # -- HTTP ----------------------------------------------------
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode().split()
+            headers = {}
+            while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                key, _, value = line.decode().partition(':')
+                headers[key.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+            if request_line[:2] == ['GET', '/stats']:
+                await self._respond(writer, 200, json.dumps(self.stats).encode())
+            elif request_line[:2] == ['POST', '/jobs']:
+                await self._handle_jobs(writer, body)
+            else:
+                await self._respond(writer, 404, b'{"error": "not found"}')
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_jobs(self, writer, body):
+        jobs = []
+        for line in body.splitlines():
+            if line.strip():
+                try:
+                    jobs.append(json.loads(line))
+                except ValueError:
+                    jobs.append(line.decode(errors='replace'))   # answered with an error below
+        # Backpressure: refuse the whole request when it does not fit
+        if self.queue.qsize() + len(jobs) > self.queue.maxsize:
+            self.stats['rejected'] += len(jobs)
+            await self._respond(writer, 503, b'{"error": "server busy"}', {'Retry-After': '1'})
+            return
+
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n'
+                     b'Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n')
+        futures = []
+        for job in jobs:
+            error = self.validate(job)
+            if error:
+                job_id = job.get('id') if isinstance(job, dict) else None
+                self._write_chunk(writer, {'id': job_id, 'error': error})
+            else:
+                futures.append(self.submit(job))
+        # Stream every result as soon as its batch is done
+        for next_result in asyncio.as_completed(futures):
+            self._write_chunk(writer, await next_result)
+            await writer.drain()
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    @staticmethod
+    def _write_chunk(writer, payload):
+        data = json.dumps(payload).encode() + b'\n'
+        writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    @staticmethod
+    async def _respond(writer, status, body, extra_headers=None):
+        reason = {200: 'OK', 404: 'Not Found', 503: 'Service Unavailable'}[status]
+        head = [f'HTTP/1.1 {status} {reason}', 'Content-Type: application/json',
+                f'Content-Length: {len(body)}', 'Connection: close']
+        head += [f'{key}: {value}' for key, value in (extra_headers or {}).items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + body)
+        await writer.drain()
+
+# ---------------------------------------------------------------
+# 4) A MINIMAL CLIENT AND THE THROUGHPUT DEMONSTRATION
+# ---------------------------------------------------------------
+
+async def post_jobs(host, port, jobs):
+    """Posts a list of jobs and collects the streamed results."""
+    reader, writer = await asyncio.open_connection(host, port)
+    body = b'\n'.join(json.dumps(job).encode() for job in jobs)
+    writer.write(b'POST /jobs HTTP/1.1\r\nHost: %s\r\nContent-Length: %d\r\n\r\n%s'
+                 % (host.encode(), len(body), body))
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    while (await reader.readline()) not in (b'\r\n', b''):
+        pass
+    results = []
+    if status == 200:
+        while (size := int(await reader.readline(), 16)) > 0:
+            results.append(json.loads(await reader.readexactly(size)))
+            await reader.readline()
+    writer.close()
+    return status, results
+
+async def demo(port, n_jobs=20000, jobs_per_request=500):
+    server = JobServer()
+    await server.start()
+    tcp = await asyncio.start_server(server.handle, '127.0.0.1', port)
+
+    rng = np.random.default_rng(0)
+    t_grid = np.linspace(0, 10, 50).tolist()
+    jobs = [{'id': i, 'mechanism': 'consecutive', 'params': rng.uniform(0.1, 1.0, 2).tolist(),
+             'y0': [1.0, 0.0, 0.0], 't': t_grid} for i in range(n_jobs)]
+
+    start = timer.perf_counter()
+    responses = await asyncio.gather(*[post_jobs('127.0.0.1', port, jobs[i:i + jobs_per_request])
+                                       for i in range(0, n_jobs, jobs_per_request)])
+    elapsed = timer.perf_counter() - start
+
+    results = {r['id']: r for _, batch in responses for r in batch}
+    check = results[0]['y'][-1]
+    k1, k2 = jobs[0]['params']
+    exact_A = np.exp(-k1 * 10)
+    print(f"{len(results)} jobs in {elapsed:.2f} s -> {len(results) / elapsed:.0f} simulations/s")
+    print(f"batches: {server.stats['batches']} (mean size {server.stats['completed'] / server.stats['batches']:.0f})")
+    print(f"job 0: [A](10) = {check[0]:.6f}, exact {exact_A:.6f}")
+
+    # A fast job keeps its accuracy when batched with 511 slow ones
+    t_check = np.linspace(0, 10, 50)
+    fast, slow = [5.0, 4.0], rng.uniform(0.01, 0.1, (511, 2))
+    alone = simulate_batch('consecutive', t_check, [[1.0, 0.0, 0.0]], [fast])[0]
+    batched = simulate_batch('consecutive', t_check, np.tile([1.0, 0.0, 0.0], (512, 1)),
+                             np.vstack([fast, slow]))[0]
+    exact_B = fast[0] / (fast[1] - fast[0]) * (np.exp(-fast[0] * t_check) - np.exp(-fast[1] * t_check))
+    print(f"k = (5, 4), max error of [B]: alone {np.abs(alone[:, 1] - exact_B).max():.1e}, "
+          f"in a batch of 512 {np.abs(batched[:, 1] - exact_B).max():.1e}")
+
+    # Problem jobs: an extremely stiff one (k = 1e30) is batched with a
+    # normal one and both come back; malformed jobs get an error line each
+    problem_jobs = [
+        {'id': 'k = 1e30', 'mechanism': 'self_catalyzed', 'params': [1e30], 'y0': [0.8, 0.001], 't': t_grid},
+        {'id': 'k = 1', 'mechanism': 'self_catalyzed', 'params': [1.0], 'y0': [0.8, 0.001], 't': t_grid},
+        {'id': 'k = NaN', 'mechanism': 'self_catalyzed', 'params': [float('nan')], 'y0': [0.8, 0.001], 't': t_grid},
+        {'id': 'y0 = 3', 'mechanism': 'consecutive', 'params': [0.5, 0.3], 'y0': 3, 't': t_grid},
+        [1, 2, 3],
+    ]
+    start = timer.perf_counter()
+    status, results = await post_jobs('127.0.0.1', port, problem_jobs)
+    print(f"\nproblem jobs (HTTP {status}, {timer.perf_counter() - start:.2f} s):")
+    for result in results:
+        outcome = result.get('error') or f"[B](10) = {result['y'][-1][1]:.6f}"
+        print(f"  {result['id']!s:9s}: {outcome}")
+
+    tcp.close()
+    await tcp.wait_closed()
+    await server.stop()
+
+async def serve(host, port, unix_path, workers):
+    server = JobServer(workers)
+    await server.start()
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle, unix_path)
+        print(f"Serving on unix socket {unix_path}")
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        print(f"Serving on http://{host}:{port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local kinetics simulation job server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='serve on a unix domain socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--demo', action='store_true', help='run the throughput demonstration')
+    args = parser.parse_args()
+
+    if args.demo:
+        asyncio.run(demo(args.port))
+    else:
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, args.workers))
+        except KeyboardInterrupt:
+            pass
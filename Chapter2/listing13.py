@@ -0,0 +1,187 @@
+import os
+import time as timer
+import multiprocessing as mp
+from multiprocessing.connection import wait
+import sympy as sp
+
+# ---------------------------------------------------------------
+# 1) DERIVATION TASKS
+#    Every task is a plain top-level function that creates its own
+#    symbols and returns a SymPy object. Tasks do not share state, so
+#    they can run in separate processes.
+# ---------------------------------------------------------------
+
+def integrated_rate_law(order):
+    # Separation of variables as in Chapter2/listing01.py, written as a
+    # definite integral so that no integration constant is needed:
+    #     ∫_{C_A0}^{C_A} C^(-n) dC = -k t
+    t, k = sp.symbols('t k', positive=True)
+    C, C_A, C_A0 = sp.symbols('C C_A C_A0', positive=True)
+    lhs = sp.integrate(C**(-order), (C, C_A0, C_A))
+    return sp.Eq(C_A, sp.solve(sp.Eq(lhs, -k * t), C_A)[0])
+
+def general_rate_law(order):
+    # Fallback: the closed-form n-th order law (n != 1), no integration needed
+    t, k = sp.symbols('t k', positive=True)
+    C_A, C_A0 = sp.symbols('C_A C_A0', positive=True)
+    if order == 1:
+        return sp.Eq(C_A, C_A0 * sp.exp(-k * t))
+    return sp.Eq(C_A, (C_A0**(1 - order) - (1 - order) * k * t)**(1 / (1 - sp.S(order))))
+
+def reversible_first_order():
+    # A <=> B (Chapter2/listing03.py)
+    t, k1, k2, A0, B0 = sp.symbols('t k1 k2 A0 B0', positive=True)
+    x = sp.Function('x')(t)
+    return sp.dsolve(sp.Eq(x.diff(t), k1 * (A0 - x) - k2 * (B0 + x)), x, ics={x.subs(t, 0): 0})
+
+def reversible_second_order():
+    # A + B <=> C + D (Chapter2/listing04.py) with C0 = D0 = 0. dsolve
+    # cannot fit the initial condition to the general solution, so the
+    # rate is factored as a (x - x1)(x - x2), with a = k1 - k2 (k1 != k2)
+    # and x1, x2 the roots of the rate, and the roots substituted afterwards
+    t, k1, k2, A0, B0 = sp.symbols('t k1 k2 A0 B0', positive=True)
+    a, x1, x2 = sp.symbols('a x1 x2', nonzero=True)
+    x = sp.Function('x')(t)
+    solution = sp.dsolve(sp.Eq(x.diff(t), a * (x - x1) * (x - x2)), x, ics={x.subs(t, 0): 0})
+    y = sp.Symbol('y')
+    roots = sp.solve(k1 * (A0 - y) * (B0 - y) - k2 * y**2, y)
+    return sp.Tuple(solution, sp.Eq(a, k1 - k2), sp.Eq(x1, roots[0]), sp.Eq(x2, roots[1]))
+
+def consecutive_intermediate():
+    # A -> B -> C (Chapter2/listing05.py)
+    t, k1, k2, C_A0 = sp.symbols('t k1 k2 C_A0', positive=True)
+    C_B = sp.Function('C_B')(t)
+    return sp.dsolve(sp.Eq(C_B.diff(t), k1 * C_A0 * sp.exp(-k1 * t) - k2 * C_B), C_B,
+                     ics={C_B.subs(t, 0): 0})
+
+def self_catalyzed():
+    # A + B -> 2B (Chapter2/listing10.py)
+    t, k, CA0, CB0 = sp.symbols('t k CA0 CB0', positive=True)
+    x = sp.Function('x')(t)
+    return sp.dsolve(sp.Eq(x.diff(t), k * (CA0 - x) * (CB0 + x)), x, ics={x.subs(t, 0): 0})
+
+def lindemann_qssa():
+    # Steady-state [A*] of the Lindemann mechanism (Chapter3/listing04.py)
+    A, Astar, k1, k2, k3 = sp.symbols('A Astar k1 k2 k3', positive=True)
+    return sp.solve(sp.Eq(k1 * A**2, Astar * (k2 * A + k3)), Astar)[0]
+
+def ethane_radicals_qssa():
+    # Radical steady states of ethane pyrolysis (Chapter3/listing05.py)
+    k1, k2, k3, k4, k5, k6 = sp.symbols('k1 k2 k3 k4 k5 k6', positive=True)
+    C1, C2, C4, C5 = sp.symbols('C1 C2 C4 C5', positive=True)
+    r1, r2, r3, r4, r5, r6 = k1*C1, k2*C2*C1, k3*C4, k4*C1*C5, k5*C4**2, k6*C4**2
+    equations = [2*r1 - r2, r2 - r3 + r4 - 2*r5 - 2*r6, r3 - r4]
+    return sp.Tuple(*sp.solve(equations, (C2, C4, C5), dict=True)[0].items())
+
+def no_fallback(*args):
+    return None
+
+# ---------------------------------------------------------------
+# 2) THE PIPELINE
+#    Each task runs in its own child process (forked where possible,
+#    so SymPy is already imported). A task that exceeds its timeout is
+#    terminated and replaced by its fallback, which runs in the parent.
+#    Results travel back as srepr strings: compact, exact, and
+#    independent of pickling support for every SymPy class.
+#    The result list always follows the order of the task list.
+# ---------------------------------------------------------------
+
+def _run_task(connection, func, args):
+    try:
+        connection.send(('ok', sp.srepr(func(*args))))
+    except Exception as error:
+        connection.send(('error', f"{type(error).__name__}: {error}"))
+    finally:
+        connection.close()
+
+def run_pipeline(tasks, max_workers=None, timeout=60.0):
+    """
+    Parameters:
+        tasks       : list  -> (name, func, args, fallback) tuples.
+        max_workers : int   -> Tasks running at the same time (default: CPU count).
+        timeout     : float -> Seconds allowed per task.
+
+    Returns:
+        List of (name, status, expression, seconds, message) in task order,
+        where status is 'ok', 'timeout' or 'error'. The last two carry the
+        fallback result and, as message, the reason the task failed.
+    """
+    context = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+    max_workers = max_workers or os.cpu_count()
+    results = [None] * len(tasks)
+    pending = list(range(len(tasks)))[::-1]
+    running = {}
+
+    def finish(i, status, expression, message=None):
+        name, func, args, fallback = tasks[i]
+        if status != 'ok':
+            expression = fallback(*args)
+        results[i] = (name, status, expression, timer.perf_counter() - running[i][2], message)
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            i = pending.pop()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_task, args=(sender, tasks[i][1], tasks[i][2]))
+            process.start()
+            sender.close()
+            running[i] = (process, receiver, timer.perf_counter())
+
+        now = timer.perf_counter()
+        next_deadline = min(start + timeout for _, _, start in running.values())
+        ready = wait([receiver for _, receiver, _ in running.values()], max(0.0, next_deadline - now))
+
+        for i in list(running):
+            process, receiver, start = running[i]
+            if receiver in ready:
+                try:
+                    status, payload = receiver.recv()
+                except EOFError:
+                    status, payload = 'error', 'worker died'
+                if status == 'ok':
+                    finish(i, status, sp.sympify(payload))
+                else:
+                    finish(i, status, None, payload)
+                process.join()
+            elif timer.perf_counter() - start > timeout:
+                process.terminate()
+                process.join()
+                finish(i, 'timeout', None, f"no result after {timeout:g} s")
+            else:
+                continue
+            receiver.close()
+            del running[i]
+    return results
+
+# ---------------------------------------------------------------
+# 3) RUN THE DERIVATIONS
+# ---------------------------------------------------------------
+
+if __name__ == '__main__':
+    orders = [0, sp.Rational(1, 2), 1, sp.Rational(3, 2), 2, sp.Rational(5, 2), 3,
+              sp.Rational(1, 3), sp.Rational(2, 3), sp.Rational(4, 3), sp.Rational(7, 2)]
+    tasks = [(f"order n = {n}", integrated_rate_law, (n,), general_rate_law) for n in orders]
+    tasks += [
+        ("A <=> B", reversible_first_order, (), no_fallback),
+        ("A + B <=> C + D", reversible_second_order, (), no_fallback),
+        ("A -> B -> C, C_B(t)", consecutive_intermediate, (), no_fallback),
+        ("A + B -> 2B", self_catalyzed, (), no_fallback),
+        ("Lindemann QSSA [A*]", lindemann_qssa, (), no_fallback),
+        ("ethane radicals QSSA", ethane_radicals_qssa, (), no_fallback),
+    ]
+
+    start = timer.perf_counter()
+    results = run_pipeline(tasks, timeout=20.0)
+    t_parallel = timer.perf_counter() - start
+
+    for name, status, expression, seconds, message in results:
+        print(f"{name}  [{status}, {seconds:.2f} s]" + (f"  {message}" if message else ""))
+        if expression is not None:
+            sp.pprint(expression)
+        print("-" * 50)
+
+    # The serial cost is the sum of the task times; with several cores the
+    # pipeline needs about that sum divided by the number of workers
+    t_serial = sum(seconds for _, _, _, seconds, _ in results)
+    print(f"\n{len(tasks)} tasks on {os.cpu_count()} CPU(s): pipeline {t_parallel:.1f} s, "
+          f"sum of task times {t_serial:.1f} s")
@@ -0,0 +1,177 @@
+import time as timer
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import odeint
+from scipy.linalg import null_space
+
+# ---------------------------------------------------------------
+# 1) EQUILIBRIUM OF A MASS-ACTION MECHANISM
+#    For reversible reactions  sum_i a_ji X_i  <=>  sum_i b_ji X_i
+#    with rate constants kf_j and kr_j, equilibrium requires
+#      detailed balance:  sum_i (b_ji - a_ji) ln C_i = ln(kf_j / kr_j)
+#      conservation:      L C = L C0   (L from the left null space of
+#                                       the stoichiometric matrix)
+#    Written in z = ln C these are n equations for n unknowns. They are
+#    solved by Newton's method with a backtracking line search, for a
+#    whole batch of initial compositions and rate constants at once.
+# ---------------------------------------------------------------
+
+def residual(z, nu, log_K, L, totals, scale):
+    # Detailed-balance rows followed by the scaled conservation rows
+    return np.concatenate([z @ nu.T - log_K, (np.exp(z) @ L.T - totals) / scale], axis=1)
+
+def equilibrium(reactants, products, kf, kr, C0, tol=1e-12, max_iter=100):
+    """
+    Parameters:
+        reactants : array -> Reactant coefficients a_ji, shape (n_reactions, n_species).
+        products  : array -> Product coefficients b_ji, same shape.
+        kf, kr    : array -> Forward and reverse rate constants, shape (B, n_reactions) or (n_reactions,).
+        C0        : array -> Initial concentrations, shape (B, n_species) or (n_species,).
+
+    Returns:
+        Equilibrium concentrations with the shape of C0.
+    """
+    nu = np.asarray(products, dtype=float) - np.asarray(reactants, dtype=float)
+    C0 = np.asarray(C0, dtype=float)
+    single = C0.ndim == 1
+    C0 = np.atleast_2d(C0)
+    B, n = C0.shape
+    log_K = np.log(np.broadcast_to(kf, (B, nu.shape[0]))) - np.log(np.broadcast_to(kr, (B, nu.shape[0])))
+
+    # Keep a set of linearly independent reactions (dependent ones follow
+    # from them when the rate constants are thermodynamically consistent)
+    independent = []
+    for j in range(nu.shape[0]):
+        if np.linalg.matrix_rank(nu[independent + [j]]) > len(independent):
+            independent.append(j)
+    nu_ind, log_K = nu[independent], log_K[:, independent]
+    L = null_space(nu).T                      # (n - rank) x n conservation laws
+    totals = C0 @ L.T
+    scale = np.abs(C0).sum(axis=1, keepdims=True)
+
+    # Start from the initial composition, with absent species at a small
+    # fraction of the total so that ln C is defined
+    z = np.log(np.maximum(C0, 1e-8 * scale))
+
+    F = residual(z, nu_ind, log_K, L, totals, scale)
+    norm = np.linalg.norm(F, axis=1)
+    for _ in range(max_iter):
+        active = norm > tol
+        if not active.any():
+            break
+        C = np.exp(z[active])
+        J = np.concatenate([np.broadcast_to(nu_ind, (active.sum(),) + nu_ind.shape),
+                            L[None, :, :] * C[:, None, :] / scale[active, :, None]], axis=1)
+        dz = -np.linalg.solve(J, F[active][..., None])[..., 0]
+        # Limit very large steps in ln C (a factor of e^5 per iteration)
+        dz *= np.minimum(1.0, 5.0 / np.abs(dz).max(axis=1, keepdims=True))
+
+        # Backtracking line search on ||F||: halve the step until it decreases
+        step = np.ones((active.sum(), 1))
+        z_active, norm_active = z[active], norm[active]
+        for _ in range(30):
+            z_trial = z_active + step * dz
+            norm_trial = np.linalg.norm(residual(z_trial, nu_ind, log_K[active], L,
+                                                      totals[active], scale[active]), axis=1)
+            better = norm_trial < (1 - 1e-4 * step[:, 0]) * norm_active
+            if better.all():
+                break
+            step[~better] *= 0.5
+        z[active] = z_trial
+        F[active] = residual(z_trial, nu_ind, log_K[active], L, totals[active], scale[active])
+        norm[active] = np.linalg.norm(F[active], axis=1)
+    else:
+        raise RuntimeError("equilibrium iteration did not converge")
+
+    C = np.exp(z)
+    return C[0] if single else C
+
+# ---------------------------------------------------------------
+# 2) A <=> B (Chapter2/listing03.py)
+# ---------------------------------------------------------------
+
+def reversible_reaction(y, t, k1, k2, A0, B0):
+    x = y[0]
+    dx_dt = k1 * (A0 - x) - k2 * (B0 + x)
+    return [dx_dt]
+
+A0_val, B0_val = 1.0, 0.2
+k1_val, k2_val = 0.45, 0.12
+C_eq = equilibrium([[1, 0]], [[0, 1]], [k1_val], [k2_val], [A0_val, B0_val])
+
+x_exact = (k1_val * A0_val - k2_val * B0_val) / (k1_val + k2_val)
+x_long = odeint(reversible_reaction, [0], np.linspace(0, 60, 300), args=(k1_val, k2_val, A0_val, B0_val))[-1, 0]
+print("A <=> B")
+print(f"  direct solver   : C_A = {C_eq[0]:.12f}, C_B = {C_eq[1]:.12f}")
+print(f"  exact           : C_A = {A0_val - x_exact:.12f}, C_B = {B0_val + x_exact:.12f}")
+print(f"  odeint to t = 60: C_A = {A0_val - x_long:.12f}")
+
+# ---------------------------------------------------------------
+# 3) A + B <=> C + D (Chapter2/listing04.py)
+# ---------------------------------------------------------------
+
+def second_order_reversible(y, t, k1, k2, A0, B0, C0, D0):
+    x = y[0]
+    dx_dt = k1 * (A0 - x) * (B0 - x) - k2 * (C0 + x) * (D0 + x)
+    return [dx_dt]
+
+A0_val, B0_val, C0_val, D0_val = 0.06, 0.05, 0.04, 0.03
+k1_val, k2_val = 0.5, 0.25
+reactants_AB = [[1, 1, 0, 0]]
+products_AB = [[0, 0, 1, 1]]
+C_eq = equilibrium(reactants_AB, products_AB, [k1_val], [k2_val], [A0_val, B0_val, C0_val, D0_val])
+
+# Exact extent: root of dx/dt = 0, i.e. of
+#   (k1 - k2) x^2 - (k1 (A0 + B0) + k2 (C0 + D0)) x + k1 A0 B0 - k2 C0 D0 = 0
+# inside the physical range -min(C0, D0) < x < min(A0, B0)
+roots = np.roots([k1_val - k2_val,
+                  -(k1_val * (A0_val + B0_val) + k2_val * (C0_val + D0_val)),
+                  k1_val * A0_val * B0_val - k2_val * C0_val * D0_val])
+x_exact = roots[(roots > -min(C0_val, D0_val)) & (roots < min(A0_val, B0_val))][0]
+t_vals = np.linspace(0, 60, 300)
+x_long = odeint(second_order_reversible, [0], t_vals,
+                args=(k1_val, k2_val, A0_val, B0_val, C0_val, D0_val))[:, 0]
+print("\nA + B <=> C + D")
+print(f"  direct solver   : x = {A0_val - C_eq[0]:.12f}")
+print(f"  exact root      : x = {x_exact:.12f}")
+print(f"  odeint to t = 60: x = {x_long[-1]:.12f}  (error {abs(x_long[-1] - x_exact):.1e})")
+
+# ---------------------------------------------------------------
+# 4) BATCH: 1e5 RANDOM COMPOSITIONS AND RATE CONSTANTS
+# ---------------------------------------------------------------
+
+rng = np.random.default_rng(0)
+N = 100000
+C0_batch = rng.uniform(0, 0.1, (N, 4))
+kf_batch = 10 ** rng.uniform(-2, 1, (N, 1))
+kr_batch = 10 ** rng.uniform(-2, 1, (N, 1))
+
+start = timer.perf_counter()
+C_batch = equilibrium(reactants_AB, products_AB, kf_batch, kr_batch, C0_batch)
+t_direct = timer.perf_counter() - start
+
+Q = C_batch[:, 2] * C_batch[:, 3] / (C_batch[:, 0] * C_batch[:, 1])
+K = (kf_batch / kr_batch)[:, 0]
+print(f"\nBatch of {N}: {t_direct:.2f} s ({1e6 * t_direct / N:.1f} us per system)")
+print(f"  max |Q/K - 1|          : {np.abs(Q / K - 1).max():.1e}")
+print(f"  max mass-balance error : {np.abs((C_batch[:, 0] + C_batch[:, 2]) - (C0_batch[:, 0] + C0_batch[:, 2])).max():.1e}")
+
+start = timer.perf_counter()
+for i in range(200):
+    odeint(second_order_reversible, [0], t_vals,
+           args=(kf_batch[i, 0], kr_batch[i, 0], *C0_batch[i]))
+t_odeint = (timer.perf_counter() - start) / 200
+print(f"  integrating to t = 60 instead: {1e6 * t_odeint:.0f} us per system")
+
+# Plot the approach to equilibrium against the directly computed limit
+plt.figure(figsize=(8, 6))
+plt.plot(t_vals, A0_val - x_long, label=r'$A_0 - x(t)$', linestyle='solid', color='black')
+plt.plot(t_vals, C0_val + x_long, label=r'$C_0 + x(t)$', linestyle='dashed', color='black')
+plt.axhline(C_eq[0], color='red', linestyle='dotted', label=r'$C_A^{eq}$ (direct)')
+plt.axhline(C_eq[2], color='blue', linestyle='dotted', label=r'$C_C^{eq}$ (direct)')
+plt.xlabel('Time')
+plt.ylabel('Concentration')
+plt.title('Second-Order Reversible Reaction and Its Equilibrium')
+plt.legend()
+plt.grid(True)
+plt.show()
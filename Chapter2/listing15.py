@@ -0,0 +1,283 @@
+import time as timer
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.linalg import lu_factor, lu_solve
+from scipy.optimize import fsolve
+
+# ---------------------------------------------------------------
+# 1) STEADY STATES OF THE SELF-CATALYZED REACTION IN A REACTOR
+#    In the batch reactor of Chapter2/listing10.py the only steady
+#    state is full conversion. Fed continuously through a cascade of
+#    stirred tanks, A + B -> 2B has a non-trivial steady state for every
+#    rate constant k:
+#      0 = (A_prev - A_i)/tau_i - k A_i B_i^m
+#      0 = (B_prev - B_i)/tau_i + k A_i B_i^m
+#    m = 1 is the rate law of listing 2.10; m = 2 (cubic autocatalysis,
+#    A + 2B -> 3B) has folds, i.e. several steady states for one k.
+#    Unknowns u = [A_1, B_1, ..., A_n, B_n], parameter lambda = k.
+# ---------------------------------------------------------------
+
+class CSTRCascade:
+    def __init__(self, n_tanks, tau, CA0, CB0, m=1):
+        self.n, self.tau_i, self.feed, self.m = n_tanks, tau / n_tanks, np.array([CA0, CB0]), m
+
+    def F(self, u, k):
+        y = u.reshape(self.n, 2)
+        inflow = np.vstack([self.feed, y[:-1]])
+        rate = k * y[:, 0] * y[:, 1]**self.m
+        return np.column_stack([(inflow[:, 0] - y[:, 0]) / self.tau_i - rate,
+                                (inflow[:, 1] - y[:, 1]) / self.tau_i + rate]).ravel()
+
+    def jac(self, u, k):
+        y = u.reshape(self.n, 2)
+        A, B = y[:, 0], y[:, 1]
+        dr_dA, dr_dB = k * B**self.m, k * self.m * A * B**(self.m - 1)
+        J = np.zeros((2 * self.n, 2 * self.n))
+        for i in range(self.n):
+            a, b = 2 * i, 2 * i + 1
+            J[a, a], J[a, b] = -1 / self.tau_i - dr_dA[i], -dr_dB[i]
+            J[b, a], J[b, b] = dr_dA[i], -1 / self.tau_i + dr_dB[i]
+            if i > 0:
+                J[a, a - 2] = J[b, b - 2] = 1 / self.tau_i
+        return J
+
+    def dF_dk(self, u, k):
+        y = u.reshape(self.n, 2)
+        rate = y[:, 0] * y[:, 1]**self.m
+        return np.column_stack([-rate, rate]).ravel()
+
+# ---------------------------------------------------------------
+# 2) THE CONTINUATION ENGINE
+#    - Chord Newton: the LU factorization of the last Jacobian is kept
+#      and reused at the next parameter value; it is only refreshed when
+#      the iteration stops contracting quickly.
+#    - Natural-parameter sweeps use a secant predictor through the two
+#      previous solutions.
+#    - Pseudo-arclength continuation follows the branch in (u, lambda)
+#      space, adapts the arclength step and detects folds as sign
+#      changes of d(lambda)/ds. Each fold is then solved for exactly
+#      from F = 0 together with a null vector of dF/du.
+# ---------------------------------------------------------------
+
+class Continuation:
+    """
+    Parameters:
+        F, jac, dF_dlam : callables -> F(u, lam), dF/du and dF/dlam.
+        tol             : float     -> Newton tolerance on the step size.
+        max_iter        : int       -> Newton iterations before giving up.
+    """
+
+    def __init__(self, F, jac, dF_dlam, tol=1e-11, max_iter=25):
+        self.F, self.jac, self.dF_dlam = F, jac, dF_dlam
+        self.tol, self.max_iter = tol, max_iter
+        self.lu = None
+        self.stats = {'factorizations': 0, 'residuals': 0}
+
+    def _factor(self, matrix):
+        self.stats['factorizations'] += 1
+        return lu_factor(matrix)
+
+    def _chord_newton(self, x, residual, jacobian, lu):
+        # Newton with a frozen factorization, refreshed when the step
+        # shrinks by less than a factor 4 per iteration
+        previous = np.inf
+        for _ in range(self.max_iter):
+            r = residual(x)
+            self.stats['residuals'] += 1
+            dx = lu_solve(lu, -r) if lu is not None else None
+            if dx is None or np.linalg.norm(dx) > 0.25 * previous:
+                lu = self._factor(jacobian(x))
+                dx = lu_solve(lu, -r)
+            x = x + dx
+            previous = np.linalg.norm(dx)
+            if previous < self.tol * (1 + np.linalg.norm(x)):
+                return x, lu, True
+        return x, lu, False
+
+    # -- natural-parameter sweep ---------------------------------
+
+    def sweep(self, u0, lambdas):
+        """
+        Returns:
+            Steady states for every value in lambdas, shape (len(lambdas), n).
+        """
+        solutions = []
+        u = u0
+        for j, lam in enumerate(lambdas):
+            if j >= 2:
+                # Secant predictor through the last two steady states
+                w = (lam - lambdas[j - 1]) / (lambdas[j - 1] - lambdas[j - 2])
+                u = solutions[-1] + w * (solutions[-1] - solutions[-2])
+            u, self.lu, converged = self._chord_newton(
+                u, lambda v: self.F(v, lam), lambda v: self.jac(v, lam), self.lu)
+            if not converged:
+                raise RuntimeError(f"no convergence at lambda = {lam}")
+            solutions.append(u)
+        return np.array(solutions)
+
+    # -- pseudo-arclength continuation ---------------------------
+
+    def _augmented_jacobian(self, x, tangent):
+        u, lam = x[:-1], x[-1]
+        return np.vstack([np.column_stack([self.jac(u, lam), self.dF_dlam(u, lam)]), tangent])
+
+    @staticmethod
+    def _locate_fold(x0, x1, x2):
+        # Quadratic through three branch points, parametrized by the chord
+        # length s; the fold is where d(lambda)/ds = 0
+        s = np.array([0.0, np.linalg.norm(x1 - x0), np.linalg.norm(x1 - x0) + np.linalg.norm(x2 - x1)])
+        coefficients = np.polyfit(s, np.array([x0, x1, x2]), 2)
+        s_fold = -coefficients[1, -1] / (2 * coefficients[0, -1])
+        return coefficients[0] * s_fold**2 + coefficients[1] * s_fold + coefficients[2]
+
+    def _refine_fold(self, x):
+        # Newton on the extended system F(u, lam) = 0, J(u, lam) v = 0,
+        # v0 . v = 1, which has the fold as a regular solution. v0 is the
+        # null vector of J at the interpolated fold; d(J v)/d(u, lam) is
+        # taken by forward differences.
+        n = len(x) - 1
+        v0 = np.linalg.svd(self.jac(x[:-1], x[-1]))[2][-1]
+
+        def residual(z):
+            u, lam, v = z[:n], z[n], z[n + 1:]
+            return np.concatenate([self.F(u, lam), self.jac(u, lam) @ v, [v0 @ v - 1]])
+
+        def jacobian(z):
+            u, lam, v = z[:n], z[n], z[n + 1:]
+            J = self.jac(u, lam)
+            h = 1e-7 * (1 + np.abs(z[:n + 1]))
+            d_Jv = np.zeros((n, n + 1))
+            for i in range(n + 1):
+                shifted = z[:n + 1].copy()
+                shifted[i] += h[i]
+                d_Jv[:, i] = (self.jac(shifted[:n], shifted[n]) @ v - J @ v) / h[i]
+            return np.vstack([np.hstack([J, self.dF_dlam(u, lam)[:, None], np.zeros((n, n))]),
+                              np.hstack([d_Jv, J]),
+                              np.concatenate([np.zeros(n + 1), v0])])
+
+        z, _, converged = self._chord_newton(np.concatenate([x, v0]), residual, jacobian, None)
+        if not converged:
+            raise RuntimeError(f"no convergence of the fold near lambda = {x[-1]}")
+        return z[:n + 1]
+
+    def arclength(self, u0, lam0, lam_min, lam_max, ds=0.01, ds_min=1e-6, ds_max=0.5, max_points=5000):
+        """
+        Follows the branch through (u0, lam0) in the direction of
+        increasing lambda until lambda leaves [lam_min, lam_max].
+
+        Returns:
+            Branch points (n_points, n + 1) with lambda in the last column,
+            and the list of detected folds (points on the branch where
+            dF/du is singular).
+        """
+        u0, lu, converged = self._chord_newton(u0, lambda v: self.F(v, lam0), lambda v: self.jac(v, lam0), None)
+        if not converged:
+            raise RuntimeError(f"no convergence at lambda = {lam0}")
+        x = np.append(u0, lam0)
+        # Initial tangent from J du/dlam = -dF/dlam, oriented towards larger lambda
+        tangent = np.append(lu_solve(lu, -self.dF_dlam(u0, lam0)), 1.0)
+        tangent /= np.linalg.norm(tangent)
+        branch, folds, lu = [x], [], None
+
+        while lam_min <= x[-1] <= lam_max and len(branch) < max_points:
+            prediction = x + ds * tangent
+
+            def residual(y):
+                return np.append(self.F(y[:-1], y[-1]), tangent @ (y - prediction))
+
+            y, lu_new, converged = self._chord_newton(
+                prediction, residual, lambda v: self._augmented_jacobian(v, tangent), lu)
+            if not converged:
+                ds *= 0.5
+                lu = None
+                if ds < ds_min:
+                    raise RuntimeError("step size too small")
+                continue
+
+            # Secant tangent, then step adaptation
+            new_tangent = (y - x) / np.linalg.norm(y - x)
+            if np.sign(new_tangent[-1]) != np.sign(tangent[-1]) and len(branch) >= 2:
+                folds.append(self._refine_fold(self._locate_fold(branch[-2], x, y)))
+            x, tangent, lu = y, new_tangent, lu_new
+            branch.append(x)
+            ds = min(ds * 1.3, ds_max)
+        return np.array(branch), folds
+
+# ---------------------------------------------------------------
+# 3) DENSE SWEEP OF k: WARM-STARTED VERSUS COLD SOLVES
+# ---------------------------------------------------------------
+
+CA0, CB0 = 0.8, 0.001            # feed concentrations as in listing 2.10
+cascade = CSTRCascade(n_tanks=25, tau=10.0, CA0=CA0, CB0=CB0)
+k_values = np.linspace(0.5, 5.0, 1000)
+guess = np.tile([0.1, CA0 + CB0 - 0.1], cascade.n)
+
+start = timer.perf_counter()
+engine = Continuation(cascade.F, cascade.jac, cascade.dF_dk)
+warm = engine.sweep(guess, k_values)
+t_warm = timer.perf_counter() - start
+
+start = timer.perf_counter()
+cold, n_fev, n_jev = [], 0, 0
+for k in k_values:
+    u, info, ier, msg = fsolve(cascade.F, guess, args=(k,), fprime=cascade.jac, xtol=1e-11, full_output=True)
+    cold.append(u)
+    n_fev, n_jev = n_fev + info['nfev'], n_jev + info['njev']
+cold = np.array(cold)
+t_cold = timer.perf_counter() - start
+physical = (cold >= 0).all(axis=1)
+
+print(f"Sweep of {len(k_values)} values of k, cascade of {cascade.n} tanks ({2 * cascade.n} unknowns):")
+print(f"  warm-started continuation: {t_warm:.2f} s, {engine.stats['factorizations']} Jacobian factorizations, "
+      f"{engine.stats['residuals']} residual evaluations")
+print(f"  independent fsolve calls : {t_cold:.2f} s, {n_jev} Jacobian evaluations, {n_fev} residual evaluations")
+print(f"  cold solves that ended on a non-physical root (negative concentration): {(~physical).sum()}")
+print(f"  largest difference on the physical ones: {np.abs(warm - cold)[physical].max():.1e}")
+
+# ---------------------------------------------------------------
+# 4) FOLDS OF THE CUBIC VARIANT (ONE TANK)
+# ---------------------------------------------------------------
+
+tank = CSTRCascade(n_tanks=1, tau=10.0, CA0=CA0, CB0=CB0, m=2)
+# k spans 0.01 - 40 while C_B changes by 1e-3 near the upper fold, so
+# the branch is followed in q = ln k to keep both directions comparable
+cubic = Continuation(lambda u, q: tank.F(u, np.exp(q)),
+                     lambda u, q: tank.jac(u, np.exp(q)),
+                     lambda u, q: np.exp(q) * tank.dF_dk(u, np.exp(q)))
+branch, folds = cubic.arclength(np.array([CA0, CB0]), np.log(0.01), np.log(0.01), np.log(40.0), ds=0.01, ds_max=0.1)
+branch[:, -1] = np.exp(branch[:, -1])
+
+# Reference: on the branch k(B) = (B - CB0) / (tau (CA0 + CB0 - B) B^2).
+# The folds are its extrema, where dk/dB = 0 reduces to
+#     2 B^2 - (CA0 + 4 CB0) B + 2 (CA0 + CB0) CB0 = 0
+B_exact = np.sort(np.roots([2.0, -(CA0 + 4 * CB0), 2 * (CA0 + CB0) * CB0]))
+k_exact = (B_exact - CB0) / (tank.tau_i * (CA0 + CB0 - B_exact) * B_exact**2)
+print(f"\nCubic autocatalysis: {len(branch)} branch points, {cubic.stats['factorizations']} factorizations")
+for fold in folds:
+    print(f"  fold at k = {np.exp(fold[-1]):.6f}, C_B = {fold[1]:.6f}")
+for k_fold, B_fold in zip(k_exact, B_exact):
+    print(f"  exact   k = {k_fold:.6f}, C_B = {B_fold:.6f}")
+found = np.array([[np.exp(fold[-1]), fold[1]] for fold in folds])
+print(f"  largest relative difference: {np.abs(found / np.column_stack([k_exact, B_exact]) - 1).max():.1e}")
+
+# Plot both continuation results
+fig, axes = plt.subplots(2, 1, figsize=(8, 10))
+axes[0].plot(k_values, warm[:, -1], 'k-', label='warm-started sweep')
+axes[0].plot(k_values[physical][::50], cold[physical][::50, -1], 'ro', label='independent solves')
+axes[0].set_xlabel('Rate constant k')
+axes[0].set_ylabel(r'Outlet $C_B$')
+axes[0].set_title(f'Self-Catalyzed Reaction in {cascade.n} Stirred Tanks')
+axes[0].legend()
+axes[0].grid(True)
+
+axes[1].plot(branch[:, -1], branch[:, 1], 'k-', label='steady-state branch')
+for fold in folds:
+    axes[1].plot(np.exp(fold[-1]), fold[1], 'rs')
+axes[1].set_xscale('log')
+axes[1].set_xlabel('Rate constant k')
+axes[1].set_ylabel(r'$C_B$')
+axes[1].set_title('Cubic Autocatalysis A + 2B -> 3B: Folds Found by Arclength Continuation')
+axes[1].grid(True)
+
+plt.tight_layout()
+plt.show()
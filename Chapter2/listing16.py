@@ -0,0 +1,225 @@
+import os
+import tempfile
+import time as timer
+import numpy as np
+import matplotlib.pyplot as plt
+
+# ---------------------------------------------------------------
+# 1) THE GENERAL n-TH ORDER INTEGRATED RATE LAW
+#    For dC/dt = -k C^n and m = n - 1,
+#        C^(-m) - C0^(-m) = m k t.
+#    With u = ln(C0 / C) and kappa = k C0^m this is
+#        g_m(u) = expm1(m u) / m = kappa t,
+#    a straight line through the origin for every order, and
+#        C(t) = C0 exp(-log1p(m kappa t) / m).
+#    Written with expm1 and log1p both forms stay accurate as m -> 0,
+#    where they tend to u = kappa t and C0 exp(-kappa t) (first order).
+#    For n < 1 the reactant is used up when 1 + m kappa t reaches 0.
+# ---------------------------------------------------------------
+
+def transformed(u, m):
+    """g_m(u) = expm1(m u) / m, equal to u for m = 0."""
+    mu = m * u
+    safe_m = np.where(m == 0, 1.0, m)
+    return np.where(m == 0, u, np.expm1(mu) / safe_m)
+
+def predict(t, C0, m, kappa, derivatives=False):
+    """
+    Parameters:
+        t        : array -> Times, shape (T,).
+        C0, m    : array -> Initial concentrations and m = n - 1, shape (B, 1).
+        kappa    : array -> k C0^m, shape (B, 1).
+
+    Returns:
+        C (B, T), and with derivatives=True also dC/dm and dC/d(ln kappa).
+    """
+    # For m = 1e-200, log1p(m s) / m equals s to the last bit, which is
+    # the first-order limit; this keeps the full (B, T) arrays branch-free
+    m = np.where(m == 0, 1e-200, m)
+    s = kappa * t
+    x = m * s
+    with np.errstate(divide='ignore'):
+        log_z = np.log1p(np.maximum(x, -1.0))     # -inf once A is used up
+    C = C0 * np.exp(-log_z / m)
+    if not derivatives:
+        return C
+
+    # dh/dm with h = log1p(x) / m is (x / (1 + x) - log1p(x)) / m^2, which
+    # cancels for small x; there the series s^2 sum_j (-1)^(j+1) (j - 1) / j x^(j-2)
+    # is used instead
+    small = np.abs(x) < 1e-2
+    series = s**2 * (-1/2 + 2/3 * x - 3/4 * x**2 + 4/5 * x**3 - 5/6 * x**4)
+    used_up = C == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dh_dm = np.where(small, series, (x / (1 + x) - log_z) / m**2)
+        dh_dq = s / (1 + x)
+        return C, np.where(used_up, 0.0, -C * dh_dm), np.where(used_up, 0.0, -C * dh_dq)
+
+# ---------------------------------------------------------------
+# 2) BATCHED FIT OF (n, k)
+#    a) Coarse grid over m on a subsample of the time points: for each
+#       order the linear form gives kappa in closed form by weighted
+#       least squares through the origin, with weights exp(-2 (m + 1) u)
+#       from propagating the concentration noise. The order with the
+#       smallest residual in C is kept.
+#       The grid takes the first measured point as C0.
+#    b) Levenberg-Marquardt refinement of (m, ln kappa, C0) on all
+#       points of the concentration residuals, with one 3 x 3 system
+#       per trace. Fitting C0 keeps the noise of the first point out of
+#       n and k. From the grid start a few iterations are enough.
+#    All operations act on a whole (B, T) block of traces at once.
+# ---------------------------------------------------------------
+
+def grid_fit(t, C, C0, m_grid):
+    u = np.log(C0 / np.maximum(C, 1e-6 * C0))
+    best_sse = np.full(len(C), np.inf)
+    best_m, best_q = np.zeros(len(C)), np.zeros(len(C))
+    for m in m_grid:
+        w = np.exp(-2 * (m + 1) * u)
+        kappa = np.maximum((w * transformed(u, m)) @ t / (w @ t**2), 1e-300)
+        sse = ((predict(t, C0, m, kappa[:, None]) - C)**2).sum(axis=1)
+        better = sse < best_sse
+        best_sse[better], best_m[better], best_q[better] = sse[better], m, np.log(kappa[better])
+    return best_m, best_q, best_sse
+
+def refine(t, C, C0, m, q, iterations=8, m_bounds=(-1.5, 4.0)):
+    # Unknowns (m, ln kappa, C0): the measured first point is noisy too,
+    # so C0 is fitted with the other two instead of being taken from it
+    mu = np.full(len(C), 1e-3)
+    C0 = np.array(C0, dtype=float)
+    sse = ((predict(t, C0, m[:, None], np.exp(q)[:, None]) - C)**2).sum(axis=1)
+    for _ in range(iterations):
+        C_fit, dC_dm, dC_dq = predict(t, C0, m[:, None], np.exp(q)[:, None], derivatives=True)
+        J = [dC_dm, dC_dq, C_fit / C0]
+        r = C - C_fit
+        g = np.column_stack([(Ji * r).sum(axis=1) for Ji in J])
+        # Damped normal equations (J^T J + mu diag(J^T J)) step = J^T r,
+        # one 3 x 3 system per trace; singular ones take no step
+        A = np.empty((len(C), 3, 3))
+        for i in range(3):
+            for j in range(i, 3):
+                A[:, i, j] = A[:, j, i] = (J[i] * J[j]).sum(axis=1)
+            A[:, i, i] *= 1 + mu
+        singular = ~(np.linalg.det(A) > 0)
+        A[singular], g[singular] = np.eye(3), 0.0
+        step = np.linalg.solve(A, g[..., None])[..., 0]
+        m_new = np.clip(m + step[:, 0], *m_bounds)
+        q_new = q + step[:, 1]
+        C0_new = C0 + step[:, 2:]
+        sse_new = ((predict(t, C0_new, m_new[:, None], np.exp(q_new)[:, None]) - C)**2).sum(axis=1)
+        accept = sse_new < sse
+        m, q, sse = np.where(accept, m_new, m), np.where(accept, q_new, q), np.where(accept, sse_new, sse)
+        C0 = np.where(accept[:, None], C0_new, C0)
+        mu = np.where(accept, mu / 3, mu * 5)
+    return m, q, C0, sse
+
+def analyze(t, C, m_grid=np.linspace(-1.0, 3.0, 9), grid_points=10, iterations=3):
+    """
+    Parameters:
+        t           : array -> Shared time grid (T,), starting at t = 0.
+        C           : array -> Concentration traces (B, T).
+        m_grid      : array -> Orders minus one tried before the refinement.
+        grid_points : int   -> Time points used for the grid search.
+        iterations  : int   -> Levenberg-Marquardt iterations on all points.
+
+    Returns:
+        Array (B, 4) with the order n, the rate constant k, the fitted
+        initial concentration C0 and the rms residual.
+    """
+    C = np.asarray(C, dtype=float)
+    C0 = C[:, :1]
+    sub = np.linspace(0, len(t) - 1, min(grid_points, len(t))).round().astype(int)
+    m, q, _ = grid_fit(t[sub], C[:, sub], C0, m_grid)
+    m, q, C0, sse = refine(t, C, C0, m, q, iterations)
+    k = np.exp(q) / C0[:, 0]**m
+    return np.column_stack([m + 1, k, C0[:, 0], np.sqrt(sse / C.shape[1])])
+
+# ---------------------------------------------------------------
+# 3) STREAMING FROM MEMORY-MAPPED FILES
+#    Traces are stored as one .npy array (B, T) and read in chunks
+#    through np.load(..., mmap_mode='r'); the results go to another
+#    memory-mapped .npy file. Only one chunk is in memory at a time.
+#    Limitation: the analysis is NOT limited by I/O. The fit runs at a
+#    few MB/s of traces, several hundred times below the read speed of
+#    the file, so a faster disk or a better file format gains nothing;
+#    only cheaper fitting arithmetic (or more cores) would.
+# ---------------------------------------------------------------
+
+def analyze_file(trace_path, t, result_path, chunk=20000):
+    traces = np.load(trace_path, mmap_mode='r')
+    results = np.lib.format.open_memmap(result_path, mode='w+', dtype=np.float64, shape=(len(traces), 4))
+    for start in range(0, len(traces), chunk):
+        results[start:start + chunk] = analyze(t, traces[start:start + chunk])
+    results.flush()
+    return results
+
+# ---------------------------------------------------------------
+# 4) SYNTHETIC TRACES: RANDOM ORDERS 0 - 3, 1 % NOISE
+# ---------------------------------------------------------------
+
+def synthetic_traces(path, t, n_traces, chunk=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    traces = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(n_traces, len(t)))
+    truth = np.empty((n_traces, 2))
+    for start in range(0, n_traces, chunk):
+        B = min(chunk, n_traces - start)
+        n = rng.uniform(0, 3, B)
+        C0 = rng.uniform(0.5, 2.0, B)
+        # Choose k so that 5 - 30 % of A is left at the end of the grid
+        remaining = rng.uniform(0.05, 0.3, B)
+        kappa = transformed(np.log(1 / remaining), n - 1) / t[-1]
+        C = predict(t, C0[:, None], (n - 1)[:, None], kappa[:, None])
+        noise = 0.01 * C + 0.002 * C0[:, None]
+        traces[start:start + B] = C + noise * rng.standard_normal(C.shape)
+        truth[start:start + B] = np.column_stack([n, kappa / C0**(n - 1)])
+    traces.flush()
+    return truth
+
+t = np.linspace(0, 10, 40)
+n_traces = 200000
+with tempfile.TemporaryDirectory() as folder:
+    trace_path = os.path.join(folder, 'traces.npy')
+    result_path = os.path.join(folder, 'orders.npy')
+    truth = synthetic_traces(trace_path, t, n_traces)
+    size_mb = os.path.getsize(trace_path) / 1e6
+
+    start = timer.perf_counter()
+    results = np.array(analyze_file(trace_path, t, result_path))
+    elapsed = timer.perf_counter() - start
+
+    start = timer.perf_counter()
+    np.array(np.load(trace_path, mmap_mode='r')).sum()
+    t_read = timer.perf_counter() - start
+    traces = np.array(np.load(trace_path, mmap_mode='r')[:4])
+
+# Compute-bound, not I/O-bound: see the limitation noted in section 3
+n_fit, k_fit = results[:, 0], results[:, 1]
+print(f"{n_traces} traces x {len(t)} points ({size_mb:.0f} MB): {elapsed:.1f} s, "
+      f"{n_traces / elapsed:.0f} traces/s ({size_mb / elapsed:.1f} MB/s; reading alone {size_mb / t_read:.0f} MB/s)")
+print(f"  order     : median |error| {np.median(np.abs(n_fit - truth[:, 0])):.3f}, "
+      f"95th percentile {np.percentile(np.abs(n_fit - truth[:, 0]), 95):.3f}")
+print(f"  k         : median relative error {np.median(np.abs(k_fit / truth[:, 1] - 1)):.3f}")
+print(f"  classified to the nearest half order: "
+      f"{np.mean(np.round(2 * n_fit) == np.round(2 * truth[:, 0])):.1%} agree with the true order")
+
+# Plot the fitted against the true orders and a few fitted traces
+fig, axes = plt.subplots(1, 2, figsize=(13, 5))
+axes[0].plot(truth[:5000, 0], n_fit[:5000], 'k.', markersize=2)
+axes[0].plot([0, 3], [0, 3], 'r-')
+axes[0].set_xlabel('True order n')
+axes[0].set_ylabel('Fitted order n')
+axes[0].set_title('Fitted Reaction Orders (5000 of the traces)')
+axes[0].grid(True)
+
+t_fine = np.linspace(0, t[-1], 200)
+for i, style in zip(range(4), ['solid', 'dotted', 'dashed', 'dashdot']):
+    C0 = results[i, 2]
+    C_fit = predict(t_fine, C0, n_fit[i] - 1, k_fit[i] * C0**(n_fit[i] - 1))
+    axes[1].plot(t, traces[i], 'o', color='gray', markersize=3)
+    axes[1].plot(t_fine, C_fit, color='black', linestyle=style, label=f'fitted n = {n_fit[i]:.2f}')
+axes[1].set_xlabel('Time (t)')
+axes[1].set_ylabel('Concentration $C_A$')
+axes[1].set_title('Kinetic Traces and Their n-th Order Fits')
+axes[1].legend()
+axes[1].grid(True)
+plt.show()
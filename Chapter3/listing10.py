@@ -0,0 +1,283 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import types
+import time as timer
+from collections import OrderedDict
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import solve_ivp, OdeSolution
+
+# ---------------------------------------------------------------
+# 1) CACHE KEY
+#    A trajectory is identified by the model, the parameters, the start
+#    time and state, the tolerances and the solver. The model counts with
+#    everything its result depends on: its code and constants, default
+#    arguments, the values captured in closures and the module-level
+#    names it reads (functions among them are fingerprinted in turn).
+#    The end time is NOT part of the key, only the direction of
+#    integration: a cached trajectory answers every request in the same
+#    direction that lies inside its time span.
+# ---------------------------------------------------------------
+
+def _code_fingerprint(code):
+    consts = tuple(_code_fingerprint(c) if isinstance(c, types.CodeType) else repr(c)
+                   for c in code.co_consts)
+    return (code.co_code, consts, code.co_names)
+
+def _global_names(code):
+    names = set(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            names |= _global_names(c)
+    return names
+
+def _value_fingerprint(value, seen):
+    if isinstance(value, types.FunctionType):
+        return model_fingerprint(value, seen)
+    if isinstance(value, types.ModuleType):
+        return ('module', value.__name__)
+    try:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return repr(value)
+
+def model_fingerprint(fun, seen=None):
+    seen = set() if seen is None else seen
+    if id(fun) in seen:               # recursive or mutually recursive models
+        return ('function', fun.__qualname__)
+    seen.add(id(fun))
+    code = fun.__code__
+    closure = tuple(_value_fingerprint(cell.cell_contents, seen) for cell in fun.__closure__ or ())
+    defaults = tuple(_value_fingerprint(v, seen) for v in fun.__defaults__ or ())
+    kwdefaults = tuple(sorted((k, _value_fingerprint(v, seen)) for k, v in (fun.__kwdefaults__ or {}).items()))
+    global_values = tuple((name, _value_fingerprint(fun.__globals__[name], seen))
+                          for name in sorted(_global_names(code)) if name in fun.__globals__)
+    return (fun.__module__, fun.__qualname__, _code_fingerprint(code),
+            closure, defaults, kwdefaults, global_values)
+
+def trajectory_key(fun, t0, direction, y0, args, method, rtol, atol):
+    payload = (model_fingerprint(fun), float(t0), int(direction),
+               np.asarray(y0, dtype=float).tobytes(),
+               np.asarray(args, dtype=float).tobytes(),
+               method, float(rtol), np.asarray(atol, dtype=float).tobytes())
+    return hashlib.sha256(pickle.dumps(payload)).hexdigest()
+
+# ---------------------------------------------------------------
+# 2) THE CACHE
+#    Entries store the solver's dense-output interpolant (OdeSolution),
+#    not sampled points, so any t_eval inside the cached span is served
+#    by interpolation. Two tiers: an in-memory LRU dictionary and an
+#    on-disk directory evicted by last access time.
+# ---------------------------------------------------------------
+
+class TrajectoryCache:
+    """
+    Parameters:
+        max_memory_entries : int -> Trajectories kept in memory.
+        disk_dir           : str -> Directory of the disk tier (None = memory only).
+        max_disk_bytes     : int -> Size limit of the disk tier.
+    """
+
+    def __init__(self, max_memory_entries=128, disk_dir=None, max_disk_bytes=256 * 2**20):
+        self.max_memory_entries = max_memory_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+                      'extensions': 0, 'evictions': 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # -- memory tier ---------------------------------------------
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    # -- disk tier -----------------------------------------------
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key + '.pkl')
+
+    @staticmethod
+    def _is_entry(name):
+        stem, extension = os.path.splitext(name)
+        return extension == '.pkl' and len(stem) == 64 and all(c in '0123456789abcdef' for c in stem)
+
+    def _load(self, key):
+        if not self.disk_dir or not os.path.exists(self._path(key)):
+            return None
+        with open(self._path(key), 'rb') as f:
+            entry = pickle.load(f)
+        os.utime(self._path(key))  # mark as recently used
+        return entry
+
+    def _store(self, key, entry):
+        if not self.disk_dir:
+            return
+        with open(self._path(key), 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Only files written by the cache (<sha256 key>.pkl) are candidates
+        files = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir)
+                 if self._is_entry(name)]
+        files.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in files)
+        while total > self.max_disk_bytes and len(files) > 1:
+            total -= os.path.getsize(files[0])
+            os.remove(files.pop(0))
+            self.stats['evictions'] += 1
+
+    def _lookup(self, key):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return self.memory[key]
+        entry = self._load(key)
+        if entry is not None:
+            self.stats['disk_hits'] += 1
+            self._remember(key, entry)
+        return entry
+
+    # -- public interface ----------------------------------------
+
+    def solve(self, fun, t_span, y0, t_eval=None, args=(), method='RK45', rtol=1e-3, atol=1e-6):
+        """
+        Drop-in replacement for solve_ivp(fun, t_span, y0, t_eval=..., args=...).
+
+        Returns:
+            (t, y) with y of shape (n_species, len(t)), like sol.t and sol.y.
+        """
+        t0, t1 = t_span
+        if t_eval is not None:
+            t_eval = np.asarray(t_eval, dtype=float)
+            if np.any(t_eval < min(t0, t1)) or np.any(t_eval > max(t0, t1)):
+                raise ValueError("Values in `t_eval` are not within `t_span`.")
+        direction = np.sign(t1 - t0)
+        key = trajectory_key(fun, t0, direction, y0, args, method, rtol, atol)
+        entry = self._lookup(key)
+
+        if entry is None:
+            self.stats['misses'] += 1
+            sol = solve_ivp(fun, t_span, y0, method=method, rtol=rtol, atol=atol,
+                            args=args, dense_output=True)
+            if not sol.success:
+                # Never cache a trajectory that stops short of t1: it would
+                # later be served by extrapolation
+                raise RuntimeError(f"integration failed: {sol.message}")
+            entry = sol.sol
+        elif entry.t_min <= min(t0, t1) and max(t0, t1) <= entry.t_max:
+            return self._sample(entry, t0, t1, t_eval)
+        else:
+            # Continue from the end of the cached trajectory (ts[-1], the
+            # far end in the direction of integration) and join the two
+            # interpolants instead of integrating again from t0.
+            self.stats['extensions'] += 1
+            t_end = entry.ts[-1]
+            sol = solve_ivp(fun, (t_end, t1), entry(t_end), method=method,
+                            rtol=rtol, atol=atol, args=args, dense_output=True)
+            if not sol.success:
+                raise RuntimeError(f"integration failed: {sol.message}")
+            entry = OdeSolution(np.concatenate([entry.ts, sol.sol.ts[1:]]),
+                                entry.interpolants + sol.sol.interpolants)
+
+        self._remember(key, entry)
+        self._store(key, entry)
+        return self._sample(entry, t0, t1, t_eval)
+
+    @staticmethod
+    def _sample(entry, t0, t1, t_eval):
+        # Without t_eval, the solver's own steps between t0 and t1 (as
+        # solve_ivp would return them, in the direction of integration),
+        # ending exactly at t1
+        if t_eval is None:
+            t = entry.ts[(entry.ts >= min(t0, t1)) & (entry.ts <= max(t0, t1))]
+            if t[-1] != t1:
+                t = np.append(t, t1)
+        else:
+            t = t_eval
+        return t, entry(t)
+
+# ---------------------------------------------------------------
+# 3) DEMONSTRATION WITH THE CHAPTER 3 SYSTEMS
+# ---------------------------------------------------------------
+
+# Pre-equilibrium A <=> B -> C (Chapter3/listing08.py), rate constants as arguments
+def reaction_system(t, y, k1, k2, k3):
+    A, B, C = y
+    dA_dt = -k1 * A + k2 * B
+    dB_dt = k1 * A - (k2 + k3) * B
+    dC_dt = k3 * B
+    return [dA_dt, dB_dt, dC_dt]
+
+# Steady-state intermediate A -> B -> P (Chapter3/listing03.py)
+def steady_state_system(t, y, k1, k2, k3):
+    A, B = y
+    dA_dt = -k1 * A
+    dB_dt = k1 * A - (k2 + k3) * B
+    return [dA_dt, dB_dt]
+
+# The disk tier lives in a temporary directory, so every run starts cold
+workspace = tempfile.TemporaryDirectory()
+cache = TrajectoryCache(max_memory_entries=32, disk_dir=os.path.join(workspace.name, 'kinetics_cache'))
+params = (1.0, 0.8, 0.01)
+y0 = [0.1, 0.0, 0.0]
+
+# The same simulation with three different output grids: only the first integrates
+start = timer.perf_counter()
+t, y_coarse = cache.solve(reaction_system, (0, 15), y0, t_eval=np.linspace(0, 15, 200), args=params, rtol=1e-8, atol=1e-11)
+t_first = timer.perf_counter() - start
+
+start = timer.perf_counter()
+for n_points in (50, 1000, 5000):
+    cache.solve(reaction_system, (0, 15), y0, t_eval=np.linspace(0, 15, n_points), args=params, rtol=1e-8, atol=1e-11)
+t_hits = (timer.perf_counter() - start) / 3
+
+# A shorter window is also a hit, a longer one continues the cached trajectory
+t_fine, y_fine = cache.solve(reaction_system, (0, 5), y0, t_eval=np.linspace(2, 5, 300), args=params, rtol=1e-8, atol=1e-11)
+t_long, y_long = cache.solve(reaction_system, (0, 60), y0, t_eval=np.linspace(0, 60, 400), args=params, rtol=1e-8, atol=1e-11)
+
+# Check the interpolated values against a fresh integration
+reference = solve_ivp(reaction_system, (0, 60), y0, t_eval=t_long, args=params, rtol=1e-8, atol=1e-11)
+print(f"first call  : {1e3 * t_first:.2f} ms (integration)")
+print(f"cached calls: {1e3 * t_hits:.2f} ms (interpolation only)")
+print(f"max deviation from a fresh solve_ivp run: {np.abs(y_long - reference.y).max():.2e}")
+
+# Listing 3.03 system, stored on disk: a new cache with an empty memory tier reads it back
+cache.solve(steady_state_system, (0, 2), [0.1, 0.0], args=(0.15, 0.07, 10))
+fresh_cache = TrajectoryCache(disk_dir=cache.disk_dir)
+t_ss, y_ss = fresh_cache.solve(steady_state_system, (0, 2), [0.1, 0.0], t_eval=np.linspace(0, 2, 100), args=(0.15, 0.07, 10))
+
+# Models that differ only in a value captured by a closure get different keys
+def make_decay(k):
+    def decay(t, y):
+        return [-k * y[0]]
+    return decay
+
+_, y_k1 = cache.solve(make_decay(1.0), (0, 1), [1.0], rtol=1e-8)
+_, y_k5 = cache.solve(make_decay(5.0), (0, 1), [1.0], rtol=1e-8)
+print(f"\nclosures with k = 1 and k = 5: A(1) = {y_k1[0, -1]:.6f} and {y_k5[0, -1]:.6f} "
+      f"(exact {np.exp(-1):.6f} and {np.exp(-5):.6f})")
+
+# Integrating backward from the same start is a different trajectory
+t_back, y_back = cache.solve(make_decay(1.0), (0, -1), [1.0], rtol=1e-8)
+print(f"backward to t = {t_back[-1]:g}: A = {y_back[0, -1]:.6f} (exact {np.exp(1):.6f})")
+
+print("\nCache statistics:", cache.stats)
+print("Second cache (disk only):", fresh_cache.stats)
+workspace.cleanup()
+
+# Plot the cached pre-equilibrium trajectory and the quasi-equilibrium approximation
+plt.figure(figsize=(8, 5))
+plt.plot(t_long, y_long[1], label=r'Cached $B(t)$', linestyle='-', linewidth=2)
+plt.plot(t_long, (params[0] / params[1]) * y_long[0], label=r'$\frac{k_1}{k_2}A(t)$', linestyle='dotted', linewidth=2)
+plt.xlabel('Time (s)')
+plt.ylabel('Concentration (M)')
+plt.title('Trajectory Served from the Dense-Output Cache')
+plt.legend()
+plt.grid(True)
+plt.show()
@@ -0,0 +1,239 @@
+import time as timer
+import sympy as sp
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import solve_ivp
+from scipy.linalg import null_space
+
+# ---------------------------------------------------------------
+# 1) CONSERVATION LAWS FROM THE STOICHIOMETRIC MATRIX
+#    With N the (species x reactions) stoichiometric matrix, dC/dt = N r.
+#    Every row vector w with w^T N = 0 (the left null space of N) gives
+#    a conserved quantity w^T C(t) = w^T C(0), whatever the rates are.
+# ---------------------------------------------------------------
+
+def conservation_laws(N, exact=True):
+    """
+    Parameters:
+        N     : Matrix / array -> Stoichiometric matrix, species x reactions.
+        exact : bool           -> SymPy nullspace (exact, integer rows) or SVD.
+
+    Returns:
+        Conservation matrix L (n_laws x n_species) with L N = 0.
+    """
+    if exact:
+        laws = []
+        for w in sp.Matrix(N).T.nullspace():
+            # Scale every law to the smallest integer coefficients
+            w = w * sp.ilcm(*[sp.fraction(c)[1] for c in w])
+            laws.append((w / sp.igcd(*[int(c) for c in w])).T)
+        return sp.Matrix.vstack(*laws) if laws else sp.zeros(0, N.shape[0])
+    return null_space(np.asarray(N, dtype=float).T).T
+
+def _rref(M, tol):
+    # Reduced row echelon form by Gauss-Jordan elimination with partial
+    # pivoting; a column whose best pivot is below tol is not a pivot
+    R, pivots = M.copy(), []
+    for col in range(R.shape[1]):
+        row = len(pivots)
+        if row == R.shape[0]:
+            break
+        p = row + np.argmax(np.abs(R[row:, col]))
+        if abs(R[p, col]) <= tol:
+            continue
+        R[[row, p]] = R[[p, row]]
+        R[row] /= R[row, col]
+        others = np.arange(len(R)) != row
+        R[others] -= np.outer(R[others, col], R[row])
+        pivots.append(col)
+    return R[:len(pivots)], pivots
+
+def dependent_species(L, preferred_order):
+    """
+    Chooses one dependent species per conservation law.
+
+    The columns of L are visited in preferred_order, and the pivot
+    columns of the reduced row echelon form become the dependent
+    species. Listing abundant species first keeps small (radical)
+    concentrations as integration variables, so they are never
+    reconstructed as a difference of large numbers. A SymPy matrix is
+    reduced exactly; a float array (the SVD basis for large systems)
+    with NumPy, treating pivots below 1e-10 max|L| as zero.
+
+    Returns:
+        (dependent, independent, R) where R is the row echelon form of L
+        in the original column order (a Matrix or an array, like L).
+    """
+    preferred_order = list(preferred_order)
+    if isinstance(L, sp.MatrixBase):
+        R, pivots = L[:, preferred_order].rref()
+        R_original = sp.zeros(len(pivots), L.shape[1])
+    else:
+        L = np.asarray(L, dtype=float)
+        R, pivots = _rref(L[:, preferred_order], 1e-10 * np.abs(L).max(initial=0.0))
+        R_original = np.zeros((len(pivots), L.shape[1]))
+    dependent = [preferred_order[p] for p in pivots]
+    independent = [i for i in range(L.shape[1]) if i not in dependent]
+    for new, old in enumerate(preferred_order):
+        R_original[:, old] = R[:len(pivots), new]
+    return dependent, independent, R_original
+
+# ---------------------------------------------------------------
+# 2) REDUCED NUMERICAL MODEL
+#    With R in echelon form (R[i, dependent[i]] = 1) and totals
+#    T = R C(0), each dependent species follows from
+#        C_dep[i] = T[i] - sum_j R[i, j] C_ind[j].
+#    Only the independent species are integrated.
+# ---------------------------------------------------------------
+
+class ReducedModel:
+    """
+    Parameters:
+        rhs       : callable -> Full right-hand side f(t, C).
+        L         : Matrix   -> Conservation matrix from conservation_laws
+                                (SymPy Matrix or float array).
+        C0        : array    -> Initial concentrations (fix the totals).
+        preferred : list     -> Column order used to choose dependent species
+                                (default: decreasing initial concentration).
+    """
+
+    def __init__(self, rhs, L, C0, preferred=None):
+        C0 = np.asarray(C0, dtype=float)
+        if preferred is None:
+            preferred = list(np.argsort(-C0, kind='stable'))
+        self.rhs = rhs
+        self.dependent, self.independent, R = dependent_species(L, preferred)
+        R = np.array(R.tolist() if isinstance(R, sp.MatrixBase) else R, dtype=float)
+        self.totals = R @ C0
+        self.R_ind = R[:, self.independent]
+        self.n = len(C0)
+
+    def reduce(self, C):
+        return np.asarray(C)[self.independent]
+
+    def reconstruct(self, x):
+        # x has shape (n_independent,) or (n_independent, n_times)
+        C = np.empty((self.n,) + np.shape(x)[1:])
+        C[self.independent] = x
+        C[self.dependent] = (self.totals.reshape((-1,) + (1,) * (np.ndim(x) - 1))
+                             - self.R_ind @ x)
+        return C
+
+    def reduced_rhs(self, t, x):
+        return np.asarray(self.rhs(t, self.reconstruct(x)))[self.independent]
+
+# ---------------------------------------------------------------
+# 3) EXACT LAWS AND SYMBOLIC ELIMINATION FOR CHAPTER3/listing01.py
+# ---------------------------------------------------------------
+
+A, B, C, D, E = sp.symbols('A B C D E')
+k1, k2, k3, k4, k5, k6 = sp.symbols('k1 k2 k3 k4 k5 k6')
+r = sp.Matrix([k1*A**2, k2*B**2*C, k3*A*B, k4*D**2, k5*B*D, k6*E])
+alpha_01 = sp.Matrix([[-2, 2, 1, 0, 0],
+                      [ 2, -2, -1, 0, 0],
+                      [-1, -1, 0, 2, 0],
+                      [ 1, 1, 0, -2, 0],
+                      [ 0, -1, 0, -1, 1],
+                      [ 0, 1, 0, 1, -1]])
+species_01 = sp.Matrix([A, B, C, D, E])
+dC_dt = alpha_01.T * r          # listing 3.01 uses alpha as reactions x species
+
+L_01 = conservation_laws(alpha_01.T)
+print("Conservation laws of listing 3.01 (L * [A, B, C, D, E] = const):")
+sp.pprint(L_01)
+
+# Eliminate the dependent species symbolically
+totals = sp.symbols(f'T1:{L_01.shape[0] + 1}')
+dep, ind, R_01 = dependent_species(L_01, [0, 1, 2, 3, 4])
+elimination = sp.solve([(R_01 * species_01)[i] - totals[i] for i in range(len(dep))],
+                       [species_01[i] for i in dep], dict=True)[0]
+print("\nDependent species:")
+sp.pprint(elimination)
+print("\nReduced rate equations:")
+for i in ind:
+    print(f"d{species_01[i]}/dt =")
+    sp.pprint(sp.expand(dC_dt[i].subs(elimination)))
+
+# ---------------------------------------------------------------
+# 4) ETHANE PYROLYSIS (CHAPTER3/listing05.py) WITHOUT THE QSSA
+# ---------------------------------------------------------------
+
+C_sym = sp.symbols('C1:9', positive=True)
+C1, C2, C3, C4, C5, C6, C7, C8 = C_sym
+r_vec = sp.Matrix([k1 * C1, k2 * C2 * C1, k3 * C4, k4 * C1 * C5, k5 * C4**2, k6 * C4**2])
+alpha_05 = sp.Matrix([
+    [-1, -1,  0, -1,  0, +1],   # C2H6
+    [ 2, -1,  0,  0,  0,  0],   # CH3*
+    [ 0, +1,  0,  0,  0,  0],   # CH4
+    [ 0, +1, -1, +1, -2, -2],   # C2H5*
+    [ 0,  0, +1, -1,  0,  0],   # H*
+    [ 0,  0, +1,  0,  0, +1],   # C2H4
+    [ 0,  0,  0, +1,  0,  0],   # H2
+    [ 0,  0,  0,  0, +1,  0]    # C4H10
+])
+names_05 = ['C2H6', 'CH3*', 'CH4', 'C2H5*', 'H*', 'C2H4', 'H2', 'C4H10']
+
+L_exact = conservation_laws(alpha_05)
+L_numeric = conservation_laws(np.array(alpha_05.tolist(), dtype=float), exact=False)
+print("\nConservation laws of listing 3.05 (exact):")
+sp.pprint(L_exact)
+print(f"Numerical (SVD) basis spans the same space: "
+      f"{np.linalg.matrix_rank(np.vstack([L_numeric, np.array(L_exact.tolist(), dtype=float)])) == L_exact.shape[0]}")
+
+# Rate constants at 1100 K as in Chapter3/listing07.py
+T = 1100
+k_vals = {k1: 4.26e16 * np.exp(-44579 / T),
+          k2: 1.65e9 * (T / 298) ** 4.25 * np.exp(-3890 / T),
+          k3: 8.85e12 * np.exp(-19469 / T),
+          k4: 1.71e12 * (T / 298) ** 2.32 * np.exp(-3414 / T),
+          k5: 1.15e13,
+          k6: 1.45e12}
+net_rates = sp.lambdify(C_sym, (alpha_05 * r_vec).subs(k_vals), 'numpy')
+
+def pyrolysis(t, C):
+    return np.ravel(net_rates(*C))
+
+C0 = np.zeros(8)
+C0[0] = 2e5 / (8.3154 * T * 1e6)   # pure ethane at 2 bar (mol/cm^3)
+# Stable products are preferred as dependent species, radicals stay integrated
+model = ReducedModel(pyrolysis, L_exact, C0, preferred=[0, 2, 5, 6, 7, 1, 3, 4])
+print(f"\nIntegrating {len(model.independent)} instead of {len(C0)} species; "
+      f"eliminated: {[names_05[i] for i in model.dependent]}")
+model_numeric = ReducedModel(pyrolysis, L_numeric, C0, preferred=[0, 2, 5, 6, 7, 1, 3, 4])
+print(f"From the SVD basis (NumPy elimination): eliminated {[names_05[i] for i in model_numeric.dependent]}")
+
+t_span = (0, 50.0)
+t_eval = np.linspace(*t_span, 400)
+atol = 1e-20
+
+start = timer.perf_counter()
+full = solve_ivp(pyrolysis, t_span, C0, method='BDF', t_eval=t_eval, rtol=1e-6, atol=atol)
+t_full = timer.perf_counter() - start
+
+start = timer.perf_counter()
+reduced = solve_ivp(model.reduced_rhs, t_span, model.reduce(C0), method='BDF', t_eval=t_eval, rtol=1e-6, atol=atol)
+t_reduced = timer.perf_counter() - start
+C_reduced = model.reconstruct(reduced.y)
+
+# Mass-balance drift: the reduced model conserves the invariants exactly
+L_float = np.array(L_exact.tolist(), dtype=float)
+drift_full = np.abs(L_float @ full.y - (L_float @ C0)[:, None]).max() / C0[0]
+drift_reduced = np.abs(L_float @ C_reduced - (L_float @ C0)[:, None]).max() / C0[0]
+print(f"full    : {t_full:.2f} s, {full.nfev} rhs calls, {full.nlu} LU factorizations (8 x 8), "
+      f"relative invariant drift {drift_full:.1e}")
+print(f"reduced : {t_reduced:.2f} s, {reduced.nfev} rhs calls, {reduced.nlu} LU factorizations (6 x 6), "
+      f"relative invariant drift {drift_reduced:.1e}")
+
+# Plot the stable species from both integrations
+plt.figure(figsize=(8, 6))
+for i, style in zip([0, 2, 5, 6, 7], ['solid', 'dotted', 'dashed', 'dashdot', (0, (1, 3))]):
+    plt.plot(t_eval, full.y[i], color='gray', linestyle=style, linewidth=3, alpha=0.5)
+    plt.plot(t_eval, C_reduced[i], color='black', linestyle=style, label=names_05[i])
+plt.yscale('log')
+plt.ylim(1e-12, 1e-4)
+plt.xlabel('Time (s)')
+plt.ylabel(r'Concentration (mol/cm$^3$)')
+plt.title('Ethane Pyrolysis: Full (gray) and Reduced (black) Integration')
+plt.legend()
+plt.grid(True)
+plt.show()
@@ -0,0 +1,244 @@
+import os
+import tempfile
+import time as timer
+import warnings
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.fft import dctn
+from scipy.integrate import quad
+
+# ---------------------------------------------------------------
+# 1) THE FULL MODEL (Chapter3/listing07.py)
+#    Product concentrations of ethane pyrolysis at temperature T,
+#    pressure p and residence time tau. The time integrals of the
+#    analytical ethane profile are evaluated with adaptive quadrature.
+# ---------------------------------------------------------------
+
+def rate_constants(T):
+    k1 = 4.26e16 * np.exp(-44579 / T)
+    k2 = 1.65e9 * (T / 298) ** 4.25 * np.exp(-3890 / T)
+    k3 = 8.85e12 * np.exp(-19469 / T)
+    k4 = 1.71e12 * (T / 298) ** 2.32 * np.exp(-3414 / T)
+    k5 = 1.15e13  # constant
+    k6 = 1.45e12  # constant
+    alpha = k1 * (3 * k5 + 2 * k6) / (k5 + k6)
+    beta = k3 * np.sqrt(k1 / (k5 + k6))
+    return k1, k2, k3, k4, k5, k6, alpha, beta
+
+def ethane_concentration(t, C1_0, alpha, beta):
+    # u(t) = sqrt(C(t)) reaches zero when ethane is used up; it is
+    # clipped there so the squared profile does not rise again
+    u = (-beta/alpha) + np.exp(-alpha/2 * t)*np.sqrt(C1_0) + np.exp(-alpha/2 * t)*(beta/alpha)
+    return np.maximum(u, 0.0)**2
+
+SPECIES = ['Ethane', 'Methane', 'Ethylene', 'Hydrogen', 'Butane']
+R = 8.3154  # Gas constant in J/(mol K)
+
+def full_model(T, p, tau):
+    """
+    Parameters:
+        T, p, tau : float -> Temperature (K), pressure (Pa), residence time (s).
+
+    Returns:
+        Concentrations of ethane, methane, ethylene, hydrogen and butane.
+    """
+    k1, k2, k3, k4, k5, k6, alpha, beta = rate_constants(T)
+    C1_0 = p / (R * T * 1e6)
+    args = (C1_0, alpha, beta)
+    I_C = quad(ethane_concentration, 0, tau, args=args, epsabs=0, epsrel=1e-12)[0]
+    I_sqrt = quad(lambda u: np.sqrt(ethane_concentration(u, *args)), 0, tau, epsabs=0, epsrel=1e-12)[0]
+    return np.array([ethane_concentration(tau, *args),
+                     2 * k1 * I_C,
+                     beta * (I_sqrt + (k6 / k3**2) * I_C),
+                     beta * I_sqrt,
+                     (beta**2 * k5 / k3**2) * I_C])
+
+def full_model_batch(points):
+    return np.array([full_model(*point) for point in points])
+
+# ---------------------------------------------------------------
+# 2) TENSOR-PRODUCT CHEBYSHEV SURROGATE
+#    On the box [a, b]^3 the model is sampled at Chebyshev points
+#    x_j = cos(pi (j + 1/2) / n) of every axis. The coefficients of
+#        f(x) = sum c_ijk T_i(x1) T_j(x2) T_k(x3)
+#    then follow from one multidimensional DCT. The degree of each axis
+#    is raised until the trailing coefficients along that axis and the
+#    error on random validation points are below the tolerance.
+# ---------------------------------------------------------------
+
+def chebyshev_points(n):
+    return np.cos(np.pi * (np.arange(n) + 0.5) / n)
+
+def to_unit(x, domain):
+    a, b = domain[:, 0], domain[:, 1]
+    return (2 * x - (a + b)) / (b - a)
+
+def from_unit(x, domain):
+    a, b = domain[:, 0], domain[:, 1]
+    return 0.5 * (a + b) + 0.5 * (b - a) * x
+
+class ChebyshevSurrogate:
+    """
+    Parameters:
+        coefficients : array -> Shape (n1, ..., nd, n_outputs).
+        domain       : array -> Shape (d, 2), lower and upper bound per input.
+        max_error    : array -> Maximum validation error per output.
+    """
+
+    def __init__(self, coefficients, domain, max_error=None):
+        self.coefficients = coefficients
+        self.domain = np.asarray(domain, dtype=float)
+        self.max_error = max_error
+
+    @classmethod
+    def fit(cls, func, domain, tol=1e-6, degrees=8, max_degree=64, n_validation=500, seed=0,
+            verbose=False):
+        """
+        Parameters:
+            func     : callable -> Maps (M, d) points to (M, n_outputs) values.
+            domain   : array    -> (d, 2) bounds.
+            tol      : float    -> Target error relative to each output's largest value.
+            degrees  : int/list -> Starting number of points per axis.
+            verbose  : bool     -> Print the error after every refinement.
+
+        Returns:
+            The fitted surrogate; its max_error holds the absolute
+            validation error per output. If max_degree stops the
+            refinement first, a RuntimeWarning is issued and max_error
+            exceeds tol for at least one output.
+        """
+        domain = np.asarray(domain, dtype=float)
+        d = len(domain)
+        degrees = np.broadcast_to(degrees, d).copy()
+        rng = np.random.default_rng(seed)
+        validation = from_unit(rng.uniform(-1, 1, (n_validation, d)), domain)
+        reference = func(validation)
+        scale = np.abs(reference).max(axis=0)
+
+        while True:
+            grids = np.meshgrid(*[chebyshev_points(n) for n in degrees], indexing='ij')
+            nodes = from_unit(np.stack([g.ravel() for g in grids], axis=1), domain)
+            values = func(nodes).reshape(tuple(degrees) + (-1,))
+            coefficients = dctn(values, type=2, axes=range(d)) / np.prod(degrees)
+            for axis in range(d):
+                coefficients[(slice(None),) * axis + (0,)] /= 2
+            surrogate = cls(coefficients, domain)
+            error = np.abs(surrogate(validation) - reference).max(axis=0)
+            surrogate.max_error = error
+            if verbose:
+                print(f"  points per axis {tuple(int(n) for n in degrees)}: max relative error {np.max(error / scale):.2e}")
+            if np.all(error <= tol * scale):
+                return surrogate.compress(tol * scale)
+
+            # Refine the axes whose trailing coefficients are still large
+            refine = False
+            for axis in range(d):
+                tail = np.abs(np.take(coefficients, [-2, -1], axis=axis)).max(axis=tuple(range(d))) / scale
+                if np.any(tail > 0.1 * tol) and degrees[axis] < max_degree:
+                    degrees[axis] = min(2 * degrees[axis], max_degree)
+                    refine = True
+            if not refine:
+                warnings.warn(f"max_degree = {max_degree} reached before the tolerance: max relative "
+                              f"error {np.max(error / scale):.2e} > tol = {tol:.2e}", RuntimeWarning)
+                return surrogate
+
+    def compress(self, threshold):
+        # Drop trailing coefficient slices that are negligible for every output
+        c = self.coefficients
+        d = c.ndim - 1
+        for axis in range(d):
+            size = c.shape[axis]
+            while size > 2 and np.all(np.abs(np.take(c, [size - 1], axis=axis)) < 1e-3 * threshold):
+                size -= 1
+            c = np.take(c, range(size), axis=axis)
+        return ChebyshevSurrogate(np.ascontiguousarray(c), self.domain, self.max_error)
+
+    def __call__(self, points, chunk=4096):
+        """
+        Evaluates the surrogate at (M, d) points, returns (M, n_outputs).
+        Points outside the fitted domain raise a ValueError; the series
+        is not valid there.
+        """
+        points = np.atleast_2d(points)
+        shape, n_out = self.coefficients.shape[:-1], self.coefficients.shape[-1]
+        out = np.empty((len(points), n_out))
+        for start in range(0, len(points), chunk):
+            x = to_unit(points[start:start + chunk], self.domain)
+            outside = ~(np.abs(x) <= 1 + 1e-12).all(axis=1)
+            if outside.any():
+                raise ValueError(f"point {points[start + np.argmax(outside)]} is outside the domain "
+                                 f"{self.domain.tolist()}")
+            # Only rounding can take a boundary point past +-1
+            x = np.clip(x, -1, 1)
+            theta = np.arccos(x)
+            # T_k(x) = cos(k arccos x); contract one axis at a time, the
+            # first one as a single matrix product
+            V = [np.cos(np.outer(theta[:, i], np.arange(n))) for i, n in enumerate(shape)]
+            A = V[0] @ self.coefficients.reshape(shape[0], -1)
+            for i in range(1, len(shape)):
+                A = np.einsum('mj,mjr->mr', V[i], A.reshape(len(x), shape[i], -1))
+            out[start:start + chunk] = A
+        return out
+
+    def save(self, path):
+        # max_error is left out when unknown: None would need pickling
+        extra = {} if self.max_error is None else {'max_error': self.max_error}
+        np.savez_compressed(path, coefficients=self.coefficients, domain=self.domain, **extra)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['coefficients'], data['domain'],
+                       data['max_error'] if 'max_error' in data else None)
+
+# ---------------------------------------------------------------
+# 3) BUILD, STORE AND QUERY THE SURROGATE
+# ---------------------------------------------------------------
+
+# Operating window: T (K), p (Pa), residence time (s)
+domain = [[1000.0, 1100.0], [1e5, 5e5], [0.0, 0.35]]
+
+print("Fitting the Chebyshev surrogate:")
+start = timer.perf_counter()
+surrogate = ChebyshevSurrogate.fit(full_model_batch, domain, tol=1e-6, verbose=True)
+print(f"  fitted in {timer.perf_counter() - start:.1f} s, coefficient array {surrogate.coefficients.shape}")
+
+with tempfile.TemporaryDirectory() as folder:
+    path = os.path.join(folder, 'pyrolysis_surrogate.npz')
+    surrogate.save(path)
+    surrogate = ChebyshevSurrogate.load(path)
+    print(f"  stored in {os.path.getsize(path) / 1024:.0f} kB")
+
+# Independent check on fresh random points
+rng = np.random.default_rng(1)
+test = from_unit(rng.uniform(-1, 1, (2000, 3)), np.asarray(domain))
+start = timer.perf_counter()
+exact = full_model_batch(test)
+t_full = (timer.perf_counter() - start) / len(test)
+approx = surrogate(test)
+scale = np.abs(exact).max(axis=0)
+print("\nMaximum error against the full model (2000 random points):")
+for name, err, s in zip(SPECIES, np.abs(approx - exact).max(axis=0), scale):
+    print(f"  {name:9s}: {err:.2e} mol/cm^3 ({err / s:.1e} of its largest value)")
+
+queries = from_unit(rng.uniform(-1, 1, (1000000, 3)), np.asarray(domain))
+start = timer.perf_counter()
+surrogate(queries)
+t_surrogate = (timer.perf_counter() - start) / len(queries)
+print(f"\nfull model: {1e6 * t_full:.0f} us per query, surrogate: {1e6 * t_surrogate:.2f} us per query")
+
+# Plot the yields against residence time at 1075 K and 2 bar
+tau = np.linspace(0, 0.35, 200)
+grid = np.column_stack([np.full_like(tau, 1075.0), np.full_like(tau, 2e5), tau])
+fig, ax = plt.subplots(figsize=(8, 6))
+for i, style in enumerate(['-', 'dotted', 'dashed', 'dashdot', ':']):
+    ax.plot(tau, surrogate(grid)[:, i], color='black', linestyle=style, label=f'{SPECIES[i]} (surrogate)')
+ax.plot(tau[::20], full_model_batch(grid[::20])[:, 0], 'ro', label='Ethane (full model)')
+ax.set_yscale('log')
+ax.set_ylim(1e-10, 1e-4)
+ax.set_xlabel('Residence time (s)')
+ax.set_ylabel('Concentration')
+ax.set_title('Chebyshev Surrogate of the Pyrolysis Yields at T = 1075 K, p = 2 bar')
+ax.legend()
+ax.grid()
+plt.show()
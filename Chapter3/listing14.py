@@ -0,0 +1,176 @@
+import time as timer
+import sympy as sp
+from sympy.core.cache import clear_cache
+
+# ---------------------------------------------------------------
+# 1) THE DEPENDENCY GRAPH OF THE QSSA DERIVATION (Chapter3/listing05.py)
+#    rate r_j ----------> net rate of species i   (if alpha[i, j] != 0)
+#    net rates of the radicals ---> steady-state solution for the radicals
+#    net rate i + the radical solutions it contains ---> simplified
+#                                                         steady-state rate i
+#    An edit marks only the nodes downstream of it as dirty. A dirty node
+#    whose new value equals the old one stops the propagation. Every
+#    result is also memoized on the srepr of its inputs, so undoing an
+#    edit, or reaching an expression seen before, costs a dictionary lookup.
+# ---------------------------------------------------------------
+
+class IncrementalDerivation:
+    """
+    Parameters:
+        rates    : list   -> Rate expressions r_j.
+        alpha    : Matrix -> Stoichiometric matrix, species x reactions.
+        species  : list   -> Concentration symbols, one per row of alpha.
+        radicals : list   -> Rows of alpha treated with the steady-state approximation.
+    """
+
+    def __init__(self, rates, alpha, species, radicals):
+        self.rates = list(rates)
+        self.alpha = sp.Matrix(alpha)
+        self.species = list(species)
+        self.radicals = list(radicals)
+        n = self.alpha.shape[0]
+        self.net, self.ss = [None] * n, [None] * n
+        self.solution = {}
+        self.memo = {}
+        self.dirty = set(range(n))
+        self.log = []
+
+    # -- edits ---------------------------------------------------
+
+    def set_rate(self, j, expression):
+        self.rates[j] = expression
+        self.dirty |= {i for i in range(self.alpha.shape[0]) if self.alpha[i, j] != 0}
+
+    def set_coefficient(self, i, j, value):
+        self.alpha[i, j] = value
+        self.dirty.add(i)
+
+    # -- evaluation ----------------------------------------------
+
+    def _memoized(self, node, operation, inputs, func):
+        key = (operation, sp.srepr(inputs))
+        if key in self.memo:
+            self.log.append((node, 'memo'))
+        else:
+            self.memo[key] = func()
+            self.log.append((node, 'computed'))
+        return self.memo[key]
+
+    def derive(self):
+        """
+        Brings every derived expression up to date.
+
+        Returns:
+            The steady-state net rates, one expression per species.
+        """
+        self.log = []
+        n = self.alpha.shape[0]
+        stale_ss, solve_again = set(), False
+
+        for i in sorted(self.dirty):
+            terms = sp.Tuple(*[sp.Tuple(self.alpha[i, j], self.rates[j])
+                               for j in range(len(self.rates)) if self.alpha[i, j] != 0])
+            net = self._memoized(f"net[{i}]", 'net', terms,
+                                 lambda: sp.Add(*[c * r for c, r in terms]))
+            if net != self.net[i]:
+                self.net[i] = net
+                stale_ss.add(i)
+                solve_again |= i in self.radicals
+        self.dirty = set()
+
+        if solve_again:
+            equations = sp.Tuple(*[self.net[i] for i in self.radicals])
+            unknowns = sp.Tuple(*[self.species[i] for i in self.radicals])
+            solution = self._memoized('radicals', 'solve', sp.Tuple(equations, unknowns),
+                                      lambda: sp.solve(equations, unknowns, dict=True)[0])
+            changed = {s for s in unknowns if solution.get(s) != self.solution.get(s)}
+            self.solution = solution
+            # Only the rates that contain a changed radical are affected
+            stale_ss |= {i for i in range(n) if self.net[i].free_symbols & changed}
+
+        for i in sorted(stale_ss):
+            substituted = self.net[i].subs(self.solution)
+            self.ss[i] = self._memoized(f"ss[{i}]", 'simplify', substituted,
+                                        lambda: sp.simplify(substituted))
+        return self.ss
+
+    def report(self, label, seconds):
+        computed = [node for node, how in self.log if how == 'computed']
+        cached = [node for node, how in self.log if how == 'memo']
+        untouched = 2 * self.alpha.shape[0] + 1 - len(self.log)
+        print(f"{label}: {seconds:.3f} s")
+        print(f"  recomputed   : {', '.join(computed) or '-'}")
+        print(f"  from memo    : {', '.join(cached) or '-'}")
+        print(f"  still valid  : {untouched} nodes")
+
+# ---------------------------------------------------------------
+# 2) THE MECHANISM OF CHAPTER3/listing05.py
+# ---------------------------------------------------------------
+
+k1, k2, k3, k4, k5, k6 = sp.symbols('k1 k2 k3 k4 k5 k6', positive=True)
+C_sym = sp.symbols('C1:9', positive=True)
+C1, C2, C3, C4, C5, C6, C7, C8 = C_sym
+r_vec = [k1 * C1, k2 * C2 * C1, k3 * C4, k4 * C1 * C5, k5 * C4**2, k6 * C4**2]
+alpha = sp.Matrix([
+    [-1, -1,  0, -1,  0, +1],   # C2H6
+    [ 2, -1,  0,  0,  0,  0],   # CH3*
+    [ 0, +1,  0,  0,  0,  0],   # CH4
+    [ 0, +1, -1, +1, -2, -2],   # C2H5*
+    [ 0,  0, +1, -1,  0,  0],   # H*
+    [ 0,  0, +1,  0,  0, +1],   # C2H4
+    [ 0,  0,  0, +1,  0,  0],   # H2
+    [ 0,  0,  0,  0, +1,  0]    # C4H10
+])
+names = ['C2H6', 'CH3*', 'CH4', 'C2H5*', 'H*', 'C2H4', 'H2', 'C4H10']
+radical_rows = [1, 3, 4]
+
+def full_derivation(rates, alpha):
+    # Everything redone as in listing 3.05
+    net_rates = alpha * sp.Matrix(rates)
+    sol = sp.solve([net_rates[i] for i in radical_rows], [C_sym[i] for i in radical_rows], dict=True)
+    return sp.simplify(net_rates.subs(sol[0]))
+
+def timed(func, *args):
+    # SymPy caches intermediate results internally; clearing the cache
+    # keeps the two timings independent of each other
+    clear_cache()
+    start = timer.perf_counter()
+    result = func(*args)
+    return result, timer.perf_counter() - start
+
+# ---------------------------------------------------------------
+# 3) A SEQUENCE OF MECHANISM EDITS
+# ---------------------------------------------------------------
+
+mechanism = IncrementalDerivation(r_vec, alpha, C_sym, radical_rows)
+ss, seconds = timed(mechanism.derive)
+mechanism.report("Initial derivation", seconds)
+
+def edit(label, *changes):
+    for kind, args in changes:
+        getattr(mechanism, kind)(*args)
+    result, t_incremental = timed(mechanism.derive)
+    reference, t_full = timed(full_derivation, mechanism.rates, mechanism.alpha)
+    mechanism.report(f"\n{label}", t_incremental)
+    same = all(sp.simplify(a - b) == 0 for a, b in zip(result, reference))
+    print(f"  full redo    : {t_full:.3f} s, same result: {same}")
+    return result
+
+# R5 written with the factor 1/2 of a like-radical recombination:
+# [C2H5*] and [H*] change, [CH3*] does not, so d[CH4]/dt stays valid
+edit("R5: k5 C4^2 -> k5 C4^2 / 2", ('set_rate', (4, k5 * C4**2 / 2)))
+
+# Back to the original rate law: every node is found in the memo
+edit("R5 restored", ('set_rate', (4, k5 * C4**2)))
+
+# R6 as 2 C2H5* -> 2 C2H4 + H2: only stable species change, so the
+# radical system is not solved again
+ss = edit("R6: 2 C2H5* -> 2 C2H4 + H2",
+          ('set_coefficient', (0, 5, 0)),
+          ('set_coefficient', (5, 5, 2)),
+          ('set_coefficient', (6, 5, 1)))
+
+print("\nSteady-state rates after the last edit:")
+for name, expression in zip(names, ss):
+    print(f"d[{name}]/dt =")
+    sp.pprint(expression)
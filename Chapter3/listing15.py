@@ -0,0 +1,271 @@
+import os
+import tempfile
+import time as timer
+import sympy as sp
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import BDF
+
+# ---------------------------------------------------------------
+# 1) CHECKPOINT FILES FOR SCIPY'S BDF SOLVER
+#    solve_ivp hides the solver object, but scipy.integrate.BDF can be
+#    stepped by hand. Its complete state after an accepted step is
+#      t, y, the step size h_abs, the current order, the counter of steps
+#      taken with this step size, the modified divided differences D
+#      (the BDF history), the Jacobian J and its LU factorization, and
+#      for a finite-difference Jacobian (jac=None) the increments that
+#      num_jac adapts from step to step (jac_factor).
+#    These arrays are written with np.savez(_compressed), together with
+#    the number of output rows written so far. A resumed solver gets
+#    exactly the same numbers back, so it continues with exactly the
+#    same steps. The size of a checkpoint does not grow with the run.
+# ---------------------------------------------------------------
+
+SOLVER_STATE = ['t', 't_old', 'y', 'h_abs', 'order', 'n_equal_steps', 'D', 'J',
+                'newton_tol', 'jac_factor', 'nfev', 'njev', 'nlu', 'status']
+
+def save_checkpoint(path, solver, n_out, compressed=True):
+    state = {name: getattr(solver, name) for name in SOLVER_STATE if getattr(solver, name) is not None}
+    if solver.LU is not None:
+        state['LU'], state['piv'] = solver.LU
+    # Write a temporary file and rename it: a crash while writing leaves
+    # the previous checkpoint intact
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        (np.savez_compressed if compressed else np.savez)(f, n_out=n_out, **state)
+    os.replace(temporary, path)
+
+def load_checkpoint(path, fun, jac, t_bound, **options):
+    """
+    Returns:
+        (solver, n_out): a BDF solver in the saved state and the number
+        of output rows that belong to it.
+    """
+    with np.load(path) as data:
+        t = float(data['t'])
+        finished = str(data['status']) == 'finished'
+        # The constructor evaluates fun and jac once; everything it sets up
+        # is overwritten below. A finished run has t = t_bound and no step
+        # left, so the initial step is left to the constructor.
+        first_step = None if finished else min(float(data['h_abs']), abs(t_bound - t))
+        solver = BDF(fun, t, data['y'], t_bound, jac=jac, first_step=first_step, **options)
+        for name in SOLVER_STATE:
+            if name in data:
+                setattr(solver, name, data[name][()] if data[name].ndim == 0 else data[name].copy())
+        solver.status = str(data['status'])
+        solver.order, solver.n_equal_steps = int(data['order']), int(data['n_equal_steps'])
+        solver.LU = (data['LU'].copy(order='F'), data['piv'].copy()) if 'LU' in data else None
+        return solver, int(data['n_out'])
+
+# ---------------------------------------------------------------
+# 2) THE INTEGRATION DRIVER
+#    Steps the solver and appends the solution at t_eval, taken from the
+#    dense output of every step, to a binary output file (rows of
+#    t, y_1, ..., y_n as float64). A checkpoint is written every `every`
+#    accepted steps. On resume the output file is cut back to the rows
+#    recorded in the checkpoint; the steps after it are simply redone.
+# ---------------------------------------------------------------
+
+class CheckpointedIntegration:
+    """
+    Parameters:
+        fun, jac   : callable -> f(t, y) and its Jacobian (None: finite differences).
+        t_span     : tuple    -> (t0, t_end).
+        t_eval     : array    -> Output times.
+        path       : str      -> Checkpoint file; the output goes to path + '.out'.
+        every      : int      -> Accepted steps between checkpoints (None: no checkpoints).
+        compressed : bool     -> np.savez_compressed instead of np.savez.
+        options    : dict     -> rtol, atol, max_step for BDF.
+    """
+
+    def __init__(self, fun, jac, t_span, t_eval, path, every=100, compressed=True, **options):
+        self.fun, self.jac = fun, jac
+        self.t_span, self.t_eval = t_span, np.asarray(t_eval)
+        self.path, self.every, self.compressed = path, every, compressed
+        self.output_path = path + '.out'
+        self.options = options
+        self.stats = {'steps': 0, 'checkpoints': 0, 'checkpoint_time': 0.0}
+
+    def start(self, y0):
+        self.solver = BDF(self.fun, self.t_span[0], y0, self.t_span[1], jac=self.jac, **self.options)
+        self.output = open(self.output_path, 'wb')
+        self.n_out = 0
+        if self.t_eval[0] == self.t_span[0]:
+            self._write_output(self.t_eval[:1], np.array(y0, dtype=float)[:, None])
+        return self
+
+    def resume(self):
+        self.solver, self.n_out = load_checkpoint(
+            self.path, self.fun, self.jac, self.t_span[1], **self.options)
+        row_bytes = 8 * (1 + self.solver.n)
+        os.truncate(self.output_path, self.n_out * row_bytes)
+        self.output = open(self.output_path, 'ab')
+        return self
+
+    def _write_output(self, t, y):
+        self.output.write(np.column_stack([t, y.T]).astype(np.float64).tobytes())
+        self.n_out += len(t)
+
+    def read_output(self):
+        rows = np.fromfile(self.output_path, dtype=np.float64).reshape(-1, 1 + self.solver.n)
+        return rows[:, 0], rows[:, 1:]
+
+    def checkpoint(self):
+        start = timer.perf_counter()
+        # The output rows the checkpoint refers to must reach the file first
+        self.output.flush()
+        save_checkpoint(self.path, self.solver, self.n_out, self.compressed)
+        self.stats['checkpoints'] += 1
+        self.stats['checkpoint_time'] += timer.perf_counter() - start
+
+    def run(self, max_steps=None):
+        """
+        Integrates to t_end, or stops after max_steps accepted steps
+        (used below to imitate a node that is lost).
+
+        Returns:
+            Output times and states recorded so far, arrays (M,) and (M, n).
+        """
+        solver = self.solver
+        while solver.status == 'running':
+            if max_steps is not None and self.stats['steps'] >= max_steps:
+                break
+            message = solver.step()
+            if solver.status == 'failed':
+                raise RuntimeError(message)
+            self.stats['steps'] += 1
+
+            # Output points passed by this step
+            i = self.n_out
+            j = np.searchsorted(self.t_eval, solver.t, side='right')
+            if j > i:
+                self._write_output(self.t_eval[i:j], solver.dense_output()(self.t_eval[i:j]))
+
+            if self.every and self.stats['steps'] % self.every == 0:
+                self.checkpoint()
+        self.output.close()
+        return self.read_output()
+
+# ---------------------------------------------------------------
+# 3) FULL ETHANE PYROLYSIS CHEMISTRY (CHAPTER3/listing05.py, NO QSSA)
+#    Rate constants at 1100 K from Chapter3/listing07.py.
+# ---------------------------------------------------------------
+
+k1, k2, k3, k4, k5, k6 = sp.symbols('k1 k2 k3 k4 k5 k6')
+C_sym = sp.symbols('C1:9')
+C1, C2, C3, C4, C5, C6, C7, C8 = C_sym
+r_vec = sp.Matrix([k1 * C1, k2 * C2 * C1, k3 * C4, k4 * C1 * C5, k5 * C4**2, k6 * C4**2])
+alpha = sp.Matrix([
+    [-1, -1,  0, -1,  0, +1],   # C2H6
+    [ 2, -1,  0,  0,  0,  0],   # CH3*
+    [ 0, +1,  0,  0,  0,  0],   # CH4
+    [ 0, +1, -1, +1, -2, -2],   # C2H5*
+    [ 0,  0, +1, -1,  0,  0],   # H*
+    [ 0,  0, +1,  0,  0, +1],   # C2H4
+    [ 0,  0,  0, +1,  0,  0],   # H2
+    [ 0,  0,  0,  0, +1,  0]    # C4H10
+])
+names = ['C2H6', 'CH3*', 'CH4', 'C2H5*', 'H*', 'C2H4', 'H2', 'C4H10']
+
+T = 1100
+k_vals = {k1: 4.26e16 * np.exp(-44579 / T),
+          k2: 1.65e9 * (T / 298) ** 4.25 * np.exp(-3890 / T),
+          k3: 8.85e12 * np.exp(-19469 / T),
+          k4: 1.71e12 * (T / 298) ** 2.32 * np.exp(-3414 / T),
+          k5: 1.15e13,
+          k6: 1.45e12}
+net_rates = (alpha * r_vec).subs(k_vals)
+rates_func = sp.lambdify(C_sym, net_rates, 'numpy')
+jac_func = sp.lambdify(C_sym, net_rates.jacobian(C_sym), 'numpy')
+
+def pyrolysis(t, C):
+    return np.ravel(rates_func(*C))
+
+def pyrolysis_jac(t, C):
+    return np.array(jac_func(*C), dtype=float)
+
+C0 = np.zeros(8)
+C0[0] = 2e5 / (8.3154 * T * 1e6)   # pure ethane at 2 bar (mol/cm^3)
+t_span = (0.0, 50.0)
+t_eval = np.linspace(*t_span, 401)
+options = dict(rtol=1e-10, atol=1e-22)
+workspace = tempfile.TemporaryDirectory()
+folder = workspace.name
+
+# ---------------------------------------------------------------
+# 4) OVERHEAD OF CHECKPOINTING
+# ---------------------------------------------------------------
+
+def timed_run(every, compressed=True):
+    path = os.path.join(folder, f'pyrolysis_{every}_{compressed}.npz')
+    best = np.inf
+    for _ in range(3):   # best of three, to separate the overhead from timing noise
+        driver = CheckpointedIntegration(pyrolysis, pyrolysis_jac, t_span, t_eval, path,
+                                         every=every, compressed=compressed, **options)
+        start = timer.perf_counter()
+        t_out, y_out = driver.start(C0).run()
+        best = min(best, timer.perf_counter() - start)
+    return driver, y_out, best, path
+
+reference, y_ref, t_ref, _ = timed_run(None)
+print(f"Uninterrupted run: {reference.stats['steps']} steps, {t_ref:.2f} s")
+print(f"{'every':>6s} {'format':>12s} {'time (s)':>9s} {'overhead':>9s} {'per checkpoint':>15s} {'checkpoint':>11s}")
+for every in [1, 10, 100]:
+    for compressed in [False, True]:
+        driver, y_out, seconds, path = timed_run(every, compressed)
+        assert np.array_equal(y_out, y_ref)
+        per_checkpoint = driver.stats['checkpoint_time'] / driver.stats['checkpoints']
+        print(f"{every:6d} {'compressed' if compressed else 'plain':>12s} {seconds:9.2f} "
+              f"{(seconds - t_ref) / t_ref:9.0%} {1e3 * per_checkpoint:12.2f} ms "
+              f"{os.path.getsize(path) / 1024:8.1f} kB")
+
+# ---------------------------------------------------------------
+# 5) A RUN THAT IS INTERRUPTED AND RESUMED
+#    The first driver is abandoned after 60 % of the steps; its last
+#    checkpoint is up to `every` steps older. A fresh driver resumes from
+#    the file, as it would after a restart on another node.
+# ---------------------------------------------------------------
+
+path = os.path.join(folder, 'pyrolysis_interrupted.npz')
+lost = CheckpointedIntegration(pyrolysis, pyrolysis_jac, t_span, t_eval, path, every=50, **options)
+lost.start(C0).run(max_steps=int(0.6 * reference.stats['steps']))
+print(f"\nInterrupted at t = {lost.solver.t:.4f} s after {lost.stats['steps']} steps")
+
+resumed = CheckpointedIntegration(pyrolysis, pyrolysis_jac, t_span, t_eval, path, every=50, **options).resume()
+t_resume = resumed.solver.t
+t_out, y_out = resumed.run()
+print(f"Resumed from the checkpoint at t = {t_resume:.4f} s")
+print(f"  output identical to the uninterrupted run (bit for bit): {np.array_equal(y_out, y_ref)}")
+print(f"  final BDF history identical: {np.array_equal(resumed.solver.D, reference.solver.D)}, "
+      f"step size equal: {resumed.solver.h_abs == reference.solver.h_abs}")
+
+# With a finite-difference Jacobian the restart is bit for bit as well
+path_fd = os.path.join(folder, 'pyrolysis_fd.npz')
+_, y_fd = CheckpointedIntegration(pyrolysis, None, t_span, t_eval, path_fd + '.ref', every=None,
+                                  **options).start(C0).run()
+CheckpointedIntegration(pyrolysis, None, t_span, t_eval, path_fd, every=20, **options).start(C0).run(max_steps=150)
+_, y_fd_resumed = CheckpointedIntegration(pyrolysis, None, t_span, t_eval, path_fd, every=20, **options).resume().run()
+print(f"  with jac=None, interrupted after 150 steps: output identical: {np.array_equal(y_fd_resumed, y_fd)}")
+
+# A checkpoint written on the last step resumes as a finished run
+last = CheckpointedIntegration(pyrolysis, pyrolysis_jac, t_span, t_eval, path, every=1, **options)
+last.start(C0).run()
+finished = CheckpointedIntegration(pyrolysis, pyrolysis_jac, t_span, t_eval, path, every=1, **options).resume()
+t_again, y_again = finished.run()
+print(f"  resuming the checkpoint of the final step: status '{finished.solver.status}', "
+      f"{finished.stats['steps']} steps taken, output identical: {np.array_equal(y_again, y_ref)}")
+workspace.cleanup()
+
+# Plot the stable products of the resumed run
+plt.figure(figsize=(8, 6))
+for i, style in zip([0, 2, 5, 6, 7], ['solid', 'dotted', 'dashed', 'dashdot', (0, (1, 3))]):
+    plt.plot(t_out, y_out[:, i], color='black', linestyle=style, label=names[i])
+plt.axvline(t_resume, color='red', linestyle='dotted', label='resumed from checkpoint')
+plt.yscale('log')
+plt.ylim(1e-12, 1e-4)
+plt.xlabel('Time (s)')
+plt.ylabel(r'Concentration (mol/cm$^3$)')
+plt.title('Ethane Pyrolysis at 1100 K, Integrated With Checkpoint/Restart')
+plt.legend()
+plt.grid(True)
+plt.show()